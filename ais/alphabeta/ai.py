@@ -0,0 +1,234 @@
+from itertools import product
+from time import perf_counter
+
+from tron.player import Player, Direction
+from tron.bitboard import BitBoard, popcount
+
+
+# Value of a won game, to which the remaining depth is added so that the
+# fastest wins and the slowest losses are preferred
+WIN = 1000000
+
+# Kinds of values stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class Timeout(Exception):
+    """
+    Raised when the time budget of a move is exhausted during a search.
+    """
+    pass
+
+
+def voronoi(board, me, *opponents):
+    """
+    Returns the number of empty cells that player me reaches strictly before
+    the opponents, minus the number of cells that the opponents reach first.
+
+    The players are expanded at once, one layer of cells at a time, a cell
+    reached by me and an opponent at the same time belonging to no one. The
+    opponents are expanded together, as a single team.
+    """
+    free = board.free()
+    s = board.stride
+    mine = 1 << board.heads[me]
+    theirs = 0
+    for opponent in opponents:
+        theirs |= 1 << board.heads[opponent]
+    seen = 0
+    score = 0
+    while mine or theirs:
+        mine = ((mine << 1) | (mine >> 1) | (mine << s) | (mine >> s)) & free & ~seen
+        theirs = ((theirs << 1) | (theirs >> 1) | (theirs << s) | (theirs >> s)) & free & ~seen
+        seen |= mine | theirs
+        contested = mine & theirs
+        score += popcount(mine & ~contested) - popcount(theirs & ~contested)
+    return score
+
+
+class Ai(Player):
+    """
+    This class implements an AI searching the moves of all the players with
+    alpha-beta pruning.
+
+    The simultaneous moves are searched as if the opponents knew the move of
+    the AI and played together against it, which makes the AI careful. The
+    search is deepened one move at a time until the time budget is spent, and
+    the positions are evaluated by the difference of the territories of the
+    players.
+    """
+    def __init__(self, time_budget = 0.005, max_depth = 64):
+        """
+        Creates an AI that spends at most time_budget seconds on a move.
+        """
+        super(Ai, self).__init__()
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+
+        # The occupied cells and the heads of the board of the last decision
+        self._previous = None
+
+        # Statistics of the last search
+        self.depth = 0
+        self.nodes = 0
+
+    def action(self, map, id):
+        self._deadline = perf_counter() + self.time_budget
+        self._me = id - 1
+        self._table = {}
+        self._history = {}
+        self._opponents = {}
+        self.nodes = 0
+
+        board = BitBoard.from_map(map)
+        alive = self._alive(board, id)
+        moves = board.moves(id)
+        if len(moves) <= 1:
+            self.depth = 0
+            return moves[0] if moves else Direction.UP
+
+        best = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                (value, best) = self._root(board, alive, moves, best, depth)
+            except Timeout:
+                break
+            self.depth = depth
+            # The outcome of the game is known
+            if abs(value) >= WIN:
+                break
+
+        return best
+
+    def _alive(self, board, id):
+        """
+        Returns whether each player of a board is still alive, for the AI
+        playing player id.
+
+        The eliminated players stay on the map. A player that died against
+        the border has its head on it, and the head of any eliminated player
+        does not move anymore, which is seen by comparing the board with the
+        one of the previous decision. A player that died against a body is
+        thus only known to be eliminated one move later.
+        """
+        previous = self._previous
+        if previous is not None and (previous[0] & ~board.occupied or previous[1][id - 1] == board.heads[id - 1]):
+            # The previous decision is not the one of the last move: a new
+            # game has started, or the AI is asked again for the same move
+            previous = None
+        self._previous = (board.occupied, board.heads[:])
+        return tuple(
+            head is not None and not board.on_border(head) and (previous is None or head != previous[1][k])
+            for (k, head) in enumerate(board.heads))
+
+    def _root(self, board, alive, moves, best, depth):
+        """
+        Searches the moves at the root, starting with the best move of the
+        previous iteration.
+        """
+        moves = [best] + [m for m in moves if m is not best]
+        alpha = -2 * WIN
+        for move in moves:
+            value = self._min(board, alive, move, depth, alpha, 2 * WIN)
+            if value > alpha:
+                (alpha, best) = (value, move)
+        return (alpha, best)
+
+    def _terminal(self, alive, depth):
+        """
+        Returns the value of a game which is finished for the AI, or None if
+        it goes on: the AI loses when it dies, and wins when it is the last
+        player alive.
+        """
+        if not alive[self._me]:
+            return -WIN - depth if any(alive) else 0
+        if sum(alive) == 1:
+            return WIN + depth
+        return None
+
+    def _alive_opponents(self, alive):
+        """
+        Returns the indices of the opponents that are alive.
+        """
+        opponents = self._opponents.get(alive)
+        if opponents is None:
+            opponents = [k for (k, a) in enumerate(alive) if a and k != self._me]
+            self._opponents[alive] = opponents
+        return opponents
+
+    def _max(self, board, alive, depth, alpha, beta):
+        """
+        Returns the value of a position for the AI to play.
+        """
+        self.nodes += 1
+        if perf_counter() > self._deadline:
+            raise Timeout()
+
+        if depth == 0:
+            return voronoi(board, self._me, *self._alive_opponents(alive))
+
+        key = (board.occupied, tuple(board.heads), alive)
+        entry = self._table.get(key)
+        best = None
+        if entry is not None:
+            (entry_depth, value, kind, best) = entry
+            if entry_depth >= depth:
+                if kind == EXACT or (kind == LOWER and value >= beta) or (kind == UPPER and value <= alpha):
+                    return value
+
+        moves = board.moves(self._me + 1) or [Direction.UP]
+        if best in moves:
+            moves.remove(best)
+            moves.insert(0, best)
+
+        original_alpha = alpha
+        value = -2 * WIN
+        for move in moves:
+            child = self._min(board, alive, move, depth, alpha, beta)
+            if child > value:
+                (value, best) = (child, move)
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if value <= original_alpha:
+            kind = UPPER
+        elif value >= beta:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self._table[key] = (depth, value, kind, best)
+        return value
+
+    def _min(self, board, alive, move, depth, alpha, beta):
+        """
+        Returns the value of the move of the AI, for the opponents alive to
+        answer together.
+
+        The answers that caused cutoffs before are tried first.
+        """
+        history = self._history
+        opponents = self._alive_opponents(alive)
+        moves = list(product(*[board.moves(k + 1) or [Direction.UP] for k in opponents]))
+        moves.sort(key=lambda m: -history.get((depth, m), 0))
+
+        # The players that are eliminated do not move anymore
+        directions = [None] * len(alive)
+        directions[self._me] = move
+        for answer in moves:
+            for (k, direction) in zip(opponents, answer):
+                directions[k] = direction
+            child = board.clone()
+            child_alive = tuple(child.play(directions))
+            value = self._terminal(child_alive, depth)
+            if value is None:
+                value = self._max(child, child_alive, depth - 1, alpha, beta)
+            if value < beta:
+                beta = value
+            if alpha >= beta:
+                history[(depth, answer)] = history.get((depth, answer), 0) + depth * depth
+                break
+        return beta
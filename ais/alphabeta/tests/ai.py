@@ -0,0 +1,130 @@
+import unittest
+from time import perf_counter
+
+from ais.alphabeta.ai import Ai, voronoi
+from tron.bitboard import BitBoard
+from tron.game import Game, PositionPlayer
+from tron.map import TileMap, Tile
+from tron.player import Direction, ConstantPlayer
+
+class TestAlphaBeta(unittest.TestCase):
+    def test_voronoi(self):
+        board = BitBoard(5, 1)
+        board.place(1, (0, 0))
+        board.place(2, (4, 0))
+        # The middle cell is reached by both players at the same time
+        self.assertEqual(voronoi(board, 0, 1), 0)
+
+        board = BitBoard(6, 1)
+        board.place(1, (1, 0))
+        board.place(2, (5, 0))
+        self.assertEqual(voronoi(board, 0, 1), 1)
+        self.assertEqual(voronoi(board, 1, 0), -1)
+
+    def test_only_move(self):
+        mmap = TileMap(5, 5)
+        mmap[0, 0] = Tile.PLAYER_ONE_HEAD
+        mmap[0, 1] = Tile.PLAYER_TWO_BODY
+        mmap[4, 4] = Tile.PLAYER_TWO_HEAD
+        self.assertEqual(Ai().action(mmap, 1), Direction.DOWN)
+
+    def test_avoids_dead_end(self):
+        # Going left leads to a pocket of two cells, going right to the rest
+        # of the map
+        mmap = TileMap(7, 7)
+        for y in range(7):
+            if y != 3:
+                mmap[2, y] = Tile.PLAYER_TWO_BODY
+        mmap[0, 2] = Tile.PLAYER_TWO_BODY
+        mmap[0, 4] = Tile.PLAYER_TWO_BODY
+        for x in range(3):
+            if x != 1:
+                mmap[x, 1] = Tile.PLAYER_TWO_BODY
+                mmap[x, 5] = Tile.PLAYER_TWO_BODY
+        mmap[1, 3] = Tile.PLAYER_ONE_HEAD
+        mmap[1, 2] = Tile.PLAYER_ONE_BODY
+        mmap[1, 4] = Tile.PLAYER_ONE_BODY
+        mmap[6, 6] = Tile.PLAYER_TWO_HEAD
+        self.assertEqual(Ai().action(mmap, 1), Direction.DOWN)
+
+    def test_time_budget(self):
+        mmap = TileMap(20, 20)
+        mmap[3, 4] = Tile.PLAYER_ONE_HEAD
+        mmap[15, 12] = Tile.PLAYER_TWO_HEAD
+        ai = Ai(time_budget=0.01)
+        start = perf_counter()
+        ai.action(mmap, 2)
+        self.assertLess(perf_counter() - start, 0.05)
+        self.assertGreaterEqual(ai.depth, 1)
+
+    def test_beats_constant_player(self):
+        for (position, direction) in (([5, 2], Direction.UP), ([2, 7], Direction.LEFT)):
+            game = Game(10, 10, [
+                PositionPlayer(1, ConstantPlayer(direction), position),
+                PositionPlayer(2, Ai(), [7, 7]),
+            ])
+            game.main_loop()
+            self.assertEqual(game.winner, 2)
+
+    def test_free_for_all(self):
+        board = BitBoard(7, 1, 3)
+        board.place(1, (3, 0))
+        board.place(2, (0, 0))
+        board.place(3, (6, 0))
+        # The opponents are expanded as a team
+        self.assertEqual(voronoi(board, 0, 1, 2), 0)
+        self.assertEqual(voronoi(board, 1, 0, 2), -2)
+
+        game = Game(10, 10, [
+            PositionPlayer(1, ConstantPlayer(Direction.UP), [5, 2]),
+            PositionPlayer(2, ConstantPlayer(Direction.LEFT), [2, 7]),
+            PositionPlayer(3, Ai(), [7, 7]),
+        ])
+        game.main_loop()
+        self.assertEqual(game.winner, 3)
+        self.assertTrue((game.history.moves()[:, 2] != 0).all())
+
+    def test_eliminated_opponents(self):
+        # Player one dies against the top wall while player three is alive
+        game = Game(10, 10, [
+            PositionPlayer(1, ConstantPlayer(Direction.UP), [0, 0]),
+            PositionPlayer(2, Ai(), [5, 5]),
+            PositionPlayer(3, Ai(), [8, 8]),
+        ])
+        game.main_loop()
+        moves = game.history.moves()
+        self.assertGreater(len(moves), 2)
+        self.assertTrue((moves[1:3, 1:] != 0).all())
+
+        # The heads on the borders are the ones of eliminated players
+        mmap = TileMap(5, 5)
+        mmap[-1, 0] = Tile.PLAYER_ONE_HEAD
+        mmap[2, 2] = Tile.PLAYER_TWO_HEAD
+        mmap[5, 2] = Tile.PLAYER_THREE_HEAD
+        board = BitBoard.from_map(mmap)
+        self.assertEqual(board.moves(1), [Direction.DOWN])
+        self.assertEqual(board.moves(3), [Direction.UP])
+        ai = Ai()
+        self.assertEqual(ai._alive(board, 2), (False, True, False))
+        self.assertIn(ai.action(mmap, 2), board.moves(2))
+
+        # A head that does not move anymore is the one of an eliminated player
+        mmap = TileMap(5, 5)
+        mmap[1, 1] = Tile.PLAYER_ONE_HEAD
+        mmap[3, 3] = Tile.PLAYER_TWO_HEAD
+        ai = Ai()
+        self.assertEqual(ai._alive(BitBoard.from_map(mmap), 1), (True, True))
+        mmap[1, 1] = Tile.PLAYER_ONE_BODY
+        mmap[1, 2] = Tile.PLAYER_ONE_HEAD
+        board = BitBoard.from_map(mmap)
+        self.assertEqual(ai._alive(board, 1), (True, False))
+        # Unless the AI is asked again for the same move, or a new game starts
+        self.assertEqual(ai._alive(board, 1), (True, True))
+        mmap = TileMap(5, 5)
+        mmap[1, 2] = Tile.PLAYER_ONE_HEAD
+        mmap[3, 3] = Tile.PLAYER_TWO_HEAD
+        self.assertEqual(ai._alive(BitBoard.from_map(mmap), 1), (True, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,50 +1,66 @@
 from tron.player import Player, Direction
 from tron.game import Tile
+from ais.perceptron.registry import ModelRegistry
 
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 
-import os
 
 class Net(nn.Module):
+    """
+    The perceptron, whose input is a size x size image: the whole map of a
+    10x10 game with its borders by default, or the square around the head of
+    the player on larger maps.
+    """
 
-    def __init__(self):
+    def __init__(self, size = 12):
         super(Net, self).__init__()
+        self.size = size
         self.conv1 = nn.Conv2d(1, 32, 3, 1, 1)
         self.conv2 = nn.Conv2d(32, 64, 3, 1, 1)
-        self.fc1 = nn.Linear(64*144, 400)
+        self.fc1 = nn.Linear(64*size*size, 400)
         self.fc2 = nn.Linear(400, 50)
         self.fc3 = nn.Linear(50, 4)
 
     def forward(self, x):
         x = F.relu(self.conv1(x))
         x = F.relu(self.conv2(x))
-        x = x.view(-1, 64*144)
+        x = x.view(-1, 64*self.size*self.size)
         x = F.relu(self.fc1(x))
         x = F.relu(self.fc2(x))
         return self.fc3(x)
 
 
+# The nets shared by all the Ai of the process, by checkpoint path
+models = ModelRegistry(Net)
+
+
 class Ai(Player):
     """
     This class implements an AI based on the perceptron defined in class Net
     """
-    def __init__(self):
+    def __init__(self, net = None):
         super(Ai, self).__init__()
-        self.net = Net()
-        # Load network weights if they have been initialized already
-        exists = os.path.isfile(self.find_file('ai.bak'))
-        if exists:
-            self.net.load_state_dict(torch.load(self.find_file('ai.bak')))
+        if net is None:
+            # Share the network weights with the other Ai, they are loaded from
+            # the disk only if they have been initialized and changed since
+            net = models.get(self.find_file('ai.bak'))
+        self.net = net
 
     def action(self, map, id):
 
-        game_map = map.state_for_player(id)
+        observations = getattr(map, 'observations', None)
+        if observations is not None and observations.array(id).shape == (self.net.size, self.net.size):
+            # The buffer kept up to date by the map, without any copy
+            input = observations.tensor(id)
+        else:
+            # The whole map, or the square around the head on larger maps
+            game_map = map.observation(id, self.position, self.net.size)
 
-        input = np.reshape(game_map, (1, 1, game_map.shape[0], game_map.shape[1]))
-        input = torch.from_numpy(input).float()
+            input = np.reshape(game_map, (1, 1, game_map.shape[0], game_map.shape[1]))
+            input = torch.from_numpy(input).float()
         output = self.net(input)
 
         _, predicted = torch.max(output.data, 1)
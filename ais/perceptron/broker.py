@@ -0,0 +1,109 @@
+"""
+This module contains the InferenceBroker, that gathers the observations of many
+games into batched forward passes of a Net.
+"""
+
+from concurrent.futures import Future
+from time import perf_counter
+import queue
+import threading
+
+import numpy as np
+import torch
+
+from tron.player import Player, Direction
+
+
+class InferenceBroker:
+    """
+    This class runs a Net on batches of observations submitted by concurrent games.
+
+    Observations are queued, and a background thread gathers them until there
+    are max_batch_size of them or max_wait seconds have passed since the first
+    one arrived. It then runs a single forward pass and resolves the future of
+    each observation with the value of the chosen Direction.
+    """
+    def __init__(self, net, max_batch_size = 256, max_wait = 0.001):
+        self.net = net
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, observation):
+        """
+        Submits the observation of a player, as returned by
+        TileMap.observation, and returns a future of the value of its
+        direction.
+        """
+        future = Future()
+        self._requests.put((observation, future))
+        return future
+
+    def infer(self, observations):
+        """
+        Runs the net on a batch of observations, without going through the
+        queue, and returns the values of the directions.
+
+        This is useful when the observations are already batched, like the
+        ones of a VecGame.
+        """
+        observations = np.asarray(observations)
+        inputs = torch.from_numpy(observations).float().unsqueeze(1)
+        with torch.no_grad():
+            output = self.net(inputs)
+        return output.argmax(dim=1).numpy() + 1
+
+    def close(self):
+        """
+        Stops the background thread once the pending observations are processed.
+        """
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self):
+        running = True
+        while running:
+            request = self._requests.get()
+            if request is None:
+                break
+
+            batch = [request]
+            deadline = perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - perf_counter()
+                try:
+                    if timeout > 0:
+                        request = self._requests.get(timeout=timeout)
+                    else:
+                        request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    running = False
+                    break
+                batch.append(request)
+
+            try:
+                actions = self.infer(np.stack([observation for (observation, _) in batch]))
+            except Exception as e:
+                for (_, future) in batch:
+                    future.set_exception(e)
+            else:
+                for ((_, future), action) in zip(batch, actions):
+                    future.set_result(int(action))
+
+
+class BrokeredAi(Player):
+    """
+    This class implements the perceptron AI by submitting its observations to
+    an InferenceBroker shared with other games.
+    """
+    def __init__(self, broker):
+        super(BrokeredAi, self).__init__()
+        self.broker = broker
+
+    def action(self, map, id):
+        observation = map.observation(id, self.position, self.broker.net.size)
+        return Direction(self.broker.submit(observation).result())
@@ -0,0 +1,77 @@
+"""
+This module exports the weights of a Net for the NumpyNet of
+ais.perceptron.numpy_ai, which runs without torch.
+
+It can also be run as a script to export a checkpoint:
+
+    python -m ais.perceptron.export ais/perceptron/ai.bak ais/perceptron/ai.npz
+"""
+
+import argparse
+import math
+
+import numpy as np
+import torch
+
+from ais.perceptron.ai import Net
+
+
+def conv_weights(conv):
+    """
+    Returns the weights of a convolution as a matrix of shape
+    (in_channels * kernel height * kernel width, out_channels), to multiply
+    the patches of the images on the right.
+    """
+    weight = conv.weight.detach().cpu().numpy()
+    return np.ascontiguousarray(weight.reshape(weight.shape[0], -1).T)
+
+
+def export(net, path):
+    """
+    Writes the weights of a Net to an npz file.
+
+    The images are stored with the channels last by NumpyNet, so the inputs of
+    fc1, which torch flattens channels first, are reordered accordingly. All
+    the matrices are transposed, so that the layers are simple products.
+    """
+    channels = net.conv2.out_channels
+    size = net.size
+
+    fc1 = net.fc1.weight.detach().cpu().numpy()
+    fc1 = fc1.reshape(-1, channels, size, size).transpose(0, 2, 3, 1).reshape(fc1.shape[0], -1)
+
+    arrays = {
+        'size': np.array(size),
+        'conv1_weight': conv_weights(net.conv1),
+        'conv2_weight': conv_weights(net.conv2),
+        'fc1_weight': np.ascontiguousarray(fc1.T),
+        'fc2_weight': np.ascontiguousarray(net.fc2.weight.detach().cpu().numpy().T),
+        'fc3_weight': np.ascontiguousarray(net.fc3.weight.detach().cpu().numpy().T),
+    }
+    for name in ('conv1', 'conv2', 'fc1', 'fc2', 'fc3'):
+        arrays[name + '_bias'] = getattr(net, name).bias.detach().cpu().numpy()
+
+    np.savez(path, **{name: array.astype(np.float32) for (name, array) in arrays.items()})
+
+
+def export_checkpoint(checkpoint, path):
+    """
+    Exports the Net saved in a checkpoint, as written by the training scripts.
+    """
+    state_dict = torch.load(checkpoint)
+    # The size of the input, from the number of inputs of fc1 per channel
+    channels = state_dict['conv2.weight'].shape[0]
+    net = Net(int(math.sqrt(state_dict['fc1.weight'].shape[1] // channels)))
+    net.load_state_dict(state_dict)
+    export(net, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exports a Net checkpoint for NumpyAi.')
+    parser.add_argument('checkpoint', nargs='?', default='ais/perceptron/ai.bak', help='the checkpoint to export')
+    parser.add_argument('output', nargs='?', default='ais/perceptron/ai.npz', help='the npz file to write')
+    args = parser.parse_args()
+    export_checkpoint(args.checkpoint, args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+This module contains a version of the perceptron AI that only needs NumPy, to
+run the weights exported by ais.perceptron.export without importing torch.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tron.player import Player, Direction
+
+
+class NumpyNet:
+    """
+    This class computes the same function as ais.perceptron.ai.Net, from the
+    weights of an npz file written by ais.perceptron.export.
+
+    The images are kept with the channels last, so that each convolution is a
+    single product of the 3x3 patches of the image by the weights.
+    """
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.size = int(data['size'])
+            self.layers = {name: data[name] for name in data.files if name != 'size'}
+
+    def conv(self, x, name):
+        """
+        Applies a 3x3 convolution with a padding of 1 and a ReLU to images of
+        shape (batch, height, width, channels).
+        """
+        padded = np.pad(x, ((0, 0), (1, 1), (1, 1), (0, 0)))
+        # Patches of shape (batch, height, width, channels, 3, 3)
+        patches = sliding_window_view(padded, (3, 3), axis=(1, 2))
+        patches = patches.reshape(x.shape[:3] + (-1,))
+        y = patches @ self.layers[name + '_weight']
+        y += self.layers[name + '_bias']
+        return np.maximum(y, 0, out=y)
+
+    def linear(self, x, name):
+        """
+        Applies a fully connected layer.
+        """
+        y = x @ self.layers[name + '_weight']
+        y += self.layers[name + '_bias']
+        return y
+
+    def forward(self, x):
+        """
+        Returns the outputs of the net for a batch of images of shape
+        (batch, height, width), as an array of shape (batch, 4).
+        """
+        x = np.asarray(x, dtype=np.float32)[..., None]
+        x = self.conv(x, 'conv1')
+        x = self.conv(x, 'conv2')
+        x = x.reshape(len(x), -1)
+        x = np.maximum(self.linear(x, 'fc1'), 0)
+        x = np.maximum(self.linear(x, 'fc2'), 0)
+        return self.linear(x, 'fc3')
+
+    __call__ = forward
+
+
+class NumpyAi(Player):
+    """
+    This class implements the AI of ais.perceptron.ai with a NumpyNet.
+    """
+    def __init__(self, net = None):
+        super(NumpyAi, self).__init__()
+        if net is None:
+            net = NumpyNet(self.find_file('ai.npz'))
+        self.net = net
+
+    def action(self, map, id):
+        output = self.net(map.observation(id, self.position, self.net.size)[None])
+        return Direction(int(output[0].argmax()) + 1)
@@ -0,0 +1,102 @@
+"""
+This module contains the ModelRegistry, that shares the Net of a checkpoint
+between all the Ai of a process.
+"""
+
+import hashlib
+import io
+import os
+import threading
+
+import torch
+
+
+class ModelRegistry:
+    """
+    This class keeps one Net per checkpoint path.
+
+    The checkpoint is read from the disk the first time its net is asked for,
+    and read again only when the modification time or the size of the file
+    changed, the net being reloaded only if the content of the file really
+    changed. Weights can also be pushed in memory with publish.
+    """
+    def __init__(self, factory):
+        """
+        Creates a registry whose nets are created by calling factory.
+        """
+        self.factory = factory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        Returns the shared net of a checkpoint, reloading it if the file changed.
+
+        If the file does not exist, the net keeps its initial weights.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entry(key)
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                return entry.net
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature != entry.signature:
+                with open(key, 'rb') as f:
+                    data = f.read()
+                digest = hashlib.blake2b(data).digest()
+                if digest != entry.digest:
+                    entry.net.load_state_dict(torch.load(io.BytesIO(data)))
+                    entry.digest = digest
+                entry.signature = signature
+
+            return entry.net
+
+    def publish(self, path, state_dict):
+        """
+        Loads new weights into the shared net of a checkpoint.
+
+        The current version of the file on the disk, if any, is considered to
+        be older than these weights and will not be reloaded: if the weights
+        are also saved to path, they should be published after being saved.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entry(key)
+            entry.net.load_state_dict(state_dict)
+            entry.digest = None
+            try:
+                stat = os.stat(key)
+                entry.signature = (stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                entry.signature = None
+
+    def mark_loaded(self, path):
+        """
+        Records the current version of a checkpoint file as already loaded.
+
+        This is meant to be called once the weights of the shared net have
+        been written to path, so that they are not read back.
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            entry = self._entry(key)
+            stat = os.stat(key)
+            entry.signature = (stat.st_mtime_ns, stat.st_size)
+            entry.digest = None
+
+    def _entry(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _Entry(self.factory())
+            self._entries[key] = entry
+        return entry
+
+
+class _Entry:
+    def __init__(self, net):
+        self.net = net
+        self.signature = None
+        self.digest = None
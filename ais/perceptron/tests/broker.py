@@ -0,0 +1,86 @@
+from time import perf_counter
+import unittest
+
+import numpy as np
+import torch
+
+from ais.perceptron.ai import Ai, Net
+from ais.perceptron.broker import BrokeredAi, InferenceBroker
+from tron.game import Game, PositionPlayer
+
+class RecordingNet:
+    """
+    A net that remembers the size of the batches it runs on.
+    """
+    def __init__(self, net):
+        self.net = net
+        self.size = net.size
+        self.batches = []
+
+    def __call__(self, inputs):
+        self.batches.append(len(inputs))
+        return self.net(inputs)
+
+class FailingNet:
+    def __call__(self, inputs):
+        raise RuntimeError('out of memory')
+
+class TestInferenceBroker(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.net = RecordingNet(Net())
+        self.observations = np.random.default_rng(0).integers(-1, 11, size=(10, 12, 12)).astype(np.int8)
+
+    def test_max_batch_size(self):
+        broker = InferenceBroker(self.net, max_batch_size=4, max_wait=0.5)
+        futures = [broker.submit(observation) for observation in self.observations]
+        actions = [future.result(timeout=5) for future in futures]
+        broker.close()
+        self.assertEqual(self.net.batches, [4, 4, 2])
+        self.assertEqual(actions, broker.infer(self.observations).tolist())
+
+    def test_max_wait(self):
+        broker = InferenceBroker(self.net, max_batch_size=100, max_wait=0.05)
+        start = perf_counter()
+        action = broker.submit(self.observations[0]).result(timeout=5)
+        self.assertGreaterEqual(perf_counter() - start, 0.05)
+        self.assertIn(action, (1, 2, 3, 4))
+        self.assertEqual(self.net.batches, [1])
+        broker.close()
+
+    def test_exception(self):
+        broker = InferenceBroker(FailingNet(), max_batch_size=3, max_wait=5)
+        futures = [broker.submit(observation) for observation in self.observations[:3]]
+        errors = [future.exception(timeout=5) for future in futures]
+        broker.close()
+        self.assertIsInstance(errors[0], RuntimeError)
+        self.assertTrue(all(error is errors[0] for error in errors))
+
+    def test_close(self):
+        broker = InferenceBroker(self.net, max_batch_size=100, max_wait=60)
+        futures = [broker.submit(observation) for observation in self.observations[:5]]
+        broker.close()
+        self.assertFalse(broker._thread.is_alive())
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(self.net.batches, [5])
+
+    def test_same_moves_as_ai(self):
+        broker = InferenceBroker(self.net.net)
+        rng = np.random.default_rng(1)
+        with torch.no_grad():
+            for _ in range(5):
+                starts = rng.choice(100, 2, replace=False)
+                histories = []
+                for player in (lambda: Ai(self.net.net), lambda: BrokeredAi(broker)):
+                    game = Game(10, 10, [
+                        PositionPlayer(1, player(), [int(starts[0]) // 10, int(starts[0]) % 10]),
+                        PositionPlayer(2, player(), [int(starts[1]) // 10, int(starts[1]) % 10]),
+                    ])
+                    game.main_loop()
+                    histories.append((game.winner, game.history.moves().tolist()))
+                self.assertEqual(histories[0], histories[1])
+        broker.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
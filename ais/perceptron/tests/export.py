@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from ais.perceptron.ai import Ai, Net
+from ais.perceptron.export import export
+from ais.perceptron.numpy_ai import NumpyAi, NumpyNet
+from tron.game import Game, PositionPlayer
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.net = Net()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'ai.npz')
+        export(self.net, self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_outputs(self):
+        rng = np.random.default_rng(0)
+        inputs = rng.choice(np.array([-10, -1, 1, 10], dtype=np.float32), size=(16, 12, 12))
+        with torch.no_grad():
+            expected = self.net(torch.from_numpy(inputs).unsqueeze(1)).numpy()
+        outputs = NumpyNet(self.path)(inputs)
+        self.assertEqual(outputs.shape, (16, 4))
+        self.assertTrue(np.allclose(outputs, expected, atol=1e-4))
+
+    def test_same_games(self):
+        numpy_net = NumpyNet(self.path)
+        rng = np.random.default_rng(1)
+        with torch.no_grad():
+            for _ in range(5):
+                starts = [[int(c) for c in divmod(int(s), 10)] for s in rng.choice(100, 2, replace=False)]
+                histories = []
+                for ai in (lambda: Ai(self.net), lambda: NumpyAi(numpy_net)):
+                    game = Game(10, 10, [
+                        PositionPlayer(1, ai(), list(starts[0])),
+                        PositionPlayer(2, ai(), list(starts[1])),
+                    ])
+                    game.main_loop()
+                    histories.append((game.winner, game.history.moves().tolist()))
+                self.assertEqual(histories[0], histories[1])
+
+    def test_no_torch(self):
+        code = 'import sys, ais.perceptron.numpy_ai; print("torch" in sys.modules)'
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=root)
+        self.assertEqual(output.strip(), b'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+import torch
+
+from ais.perceptron.ai import Ai, Net
+from tron.game import Game, PositionPlayer
+
+class TestAi(unittest.TestCase):
+    def test_observations(self):
+        torch.manual_seed(0)
+        net = Net()
+        rng = np.random.default_rng(0)
+        with torch.no_grad():
+            for _ in range(10):
+                starts = rng.choice(100, 2, replace=False)
+                histories = []
+                for observations in (False, True):
+                    game = Game(10, 10, [
+                        PositionPlayer(1, Ai(net), [int(starts[0]) // 10, int(starts[0]) % 10]),
+                        PositionPlayer(2, Ai(net), [int(starts[1]) // 10, int(starts[1]) % 10]),
+                    ], observations=observations)
+                    game.main_loop()
+                    histories.append((game.winner, game.history.moves().tolist()))
+                self.assertEqual(histories[0], histories[1])
+
+    def test_large_arena(self):
+        torch.manual_seed(0)
+        net = Net(16)
+        self.assertEqual(Net().fc1.in_features, 64 * 144)
+        ai = Ai(net)
+        game = Game(300, 300, [
+            PositionPlayer(1, ai, [150, 150]),
+            PositionPlayer(2, Ai(net), [20, 280]),
+        ], chunk_size=32)
+        with torch.no_grad():
+            # The net sees the square of 16x16 tiles around the head
+            state = game.map().state_around(1, (150, 150), 16)
+            expected = net(torch.from_numpy(state[None, None]).float()).argmax().item() + 1
+            game.next_frame()
+        self.assertEqual(game.history.moves()[0, 0], expected)
+        self.assertEqual(state[8, 8], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
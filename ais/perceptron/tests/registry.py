@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import torch
+from torch import nn
+
+from ais.perceptron.registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.path = os.path.join(tempfile.mkdtemp(), 'ai.bak')
+        self.registry = ModelRegistry(lambda: nn.Linear(2, 2))
+        self.load = mock.patch('ais.perceptron.registry.torch.load', wraps=torch.load).start()
+        self.addCleanup(mock.patch.stopall)
+        self.mtime = 0
+
+    def save(self, net):
+        """
+        Writes the weights of net to the checkpoint, with a new modification
+        time.
+        """
+        torch.save(net.state_dict(), self.path)
+        self.mtime += 10 ** 9
+        os.utime(self.path, ns=(self.mtime, self.mtime))
+
+    def assertWeights(self, net, expected):
+        for (name, value) in expected.state_dict().items():
+            self.assertTrue(torch.equal(net.state_dict()[name], value))
+
+    def test_missing_file(self):
+        net = self.registry.get(self.path)
+        self.assertIs(self.registry.get(self.path), net)
+        self.assertEqual(self.load.call_count, 0)
+
+    def test_shared_net(self):
+        saved = nn.Linear(2, 2)
+        self.save(saved)
+        net = self.registry.get(self.path)
+        self.assertIs(self.registry.get(self.path), net)
+        self.assertIs(self.registry.get(os.path.join(os.path.dirname(self.path), '.', 'ai.bak')), net)
+        self.assertIsNot(self.registry.get(self.path + '2'), net)
+        self.assertWeights(net, saved)
+        self.assertEqual(self.load.call_count, 1)
+
+    def test_unchanged_file(self):
+        saved = nn.Linear(2, 2)
+        self.save(saved)
+        self.registry.get(self.path)
+        self.registry.get(self.path)
+        # Touching the file without changing its content does not reload it
+        self.save(saved)
+        self.registry.get(self.path)
+        self.assertEqual(self.load.call_count, 1)
+
+    def test_rewritten_file(self):
+        self.save(nn.Linear(2, 2))
+        net = self.registry.get(self.path)
+        saved = nn.Linear(2, 2)
+        self.save(saved)
+        self.assertIs(self.registry.get(self.path), net)
+        self.assertWeights(net, saved)
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_publish(self):
+        self.save(nn.Linear(2, 2))
+        net = self.registry.get(self.path)
+        published = nn.Linear(2, 2)
+        self.registry.publish(self.path, published.state_dict())
+        # The file on the disk is older than the published weights
+        self.assertIs(self.registry.get(self.path), net)
+        self.assertWeights(net, published)
+        self.assertEqual(self.load.call_count, 1)
+
+        saved = nn.Linear(2, 2)
+        self.save(saved)
+        self.registry.get(self.path)
+        self.assertWeights(net, saved)
+        self.assertEqual(self.load.call_count, 2)
+
+    def test_mark_loaded(self):
+        net = self.registry.get(self.path)
+        self.save(net)
+        self.registry.mark_loaded(self.path)
+        self.registry.get(self.path)
+        self.assertEqual(self.load.call_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
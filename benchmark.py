@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import platform
+import random
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from tron.map import TileMap, Tile
+from tron.game import Game, PositionPlayer
+from tron.player import Direction, ConstantPlayer
+
+# This script measures the speed of the hot paths of the game, of the AI and
+# of the training. Results are printed and can be saved as JSON, and compared
+# to a previously saved baseline to find regressions:
+#
+#     ./benchmark.py --output baseline.json
+#     ./benchmark.py --compare baseline.json
+
+SCENARIOS = {}
+
+def scenario(unit, higher_is_better = True):
+    """
+    Registers a scenario, that is a function returning a function to measure
+    and the number of units processed by each call.
+    """
+    def register(function):
+        SCENARIOS[function.__name__] = (function, unit, higher_is_better)
+        return function
+    return register
+
+
+def measure(function, repeat = 5, min_time = 0.2):
+    """
+    Returns the best time taken by a call to function.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        calls = 0
+        start = perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / calls)
+    return best
+
+
+def random_positions(width, height):
+    while True:
+        positions = [[random.randint(0, width - 1), random.randint(0, height - 1)] for _ in range(2)]
+        if positions[0] != positions[1]:
+            return positions
+
+
+def filled_map(size):
+    """
+    Returns a map whose left half is filled with bodies, with two heads.
+    """
+    mmap = TileMap(size, size)
+    for i in range(size):
+        for j in range(size // 2):
+            mmap[i, j] = Tile.PLAYER_ONE_BODY if i % 2 else Tile.PLAYER_TWO_BODY
+    mmap[0, size // 2] = Tile.PLAYER_ONE_HEAD
+    mmap[size - 1, size // 2] = Tile.PLAYER_TWO_HEAD
+    return mmap
+
+
+def perceptron_net():
+    import torch
+    from ais.perceptron.ai import Net
+    torch.manual_seed(0)
+    return Net()
+
+
+@scenario('games/s')
+def game_constant():
+    def run():
+        for _ in range(10):
+            (one, two) = random_positions(10, 10)
+            Game(10, 10, [
+                PositionPlayer(1, ConstantPlayer(Direction(random.randint(1, 4))), one),
+                PositionPlayer(2, ConstantPlayer(Direction(random.randint(1, 4))), two),
+            ]).main_loop()
+    return (run, 10)
+
+
+@scenario('games/s')
+def game_constant_pool():
+    from tron.game import GamePool
+    pool = GamePool(10, 10, [
+        lambda: ConstantPlayer(Direction.UP),
+        lambda: ConstantPlayer(Direction.UP),
+    ])
+
+    def run():
+        for _ in range(10):
+            game = pool.acquire(random_positions(10, 10))
+            for pp in game.pps:
+                pp.player.direction = Direction(random.randint(1, 4))
+            game.main_loop()
+            pool.release(game)
+    return (run, 10)
+
+
+def perceptron_game(observations):
+    import torch
+    from ais.perceptron.ai import Ai
+    net = perceptron_net()
+
+    def run():
+        (one, two) = random_positions(10, 10)
+        with torch.no_grad():
+            Game(10, 10, [
+                PositionPlayer(1, Ai(net), one),
+                PositionPlayer(2, Ai(net), two),
+            ], observations=observations).main_loop()
+    return (run, 1)
+
+
+@scenario('games/s')
+def game_ai():
+    return perceptron_game(False)
+
+
+@scenario('games/s')
+def game_ai_observations():
+    return perceptron_game(True)
+
+
+@scenario('games/s')
+def vecgame():
+    from tron.vecgame import VecGame
+    games = VecGame(1024, 10, 10, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(1, 5, size=(64, 1024, 2))
+
+    def run():
+        finished = 0
+        for step in range(64):
+            (done, _) = games.step(actions[step])
+            finished += done.sum()
+        return finished
+
+    # Games finished by a call, on average
+    finished = np.mean([run() for _ in range(10)])
+    return (run, finished)
+
+
+@scenario('steps/s')
+def vecenv():
+    from tron.env import VecTronEnv
+    env = VecTronEnv(1024, 10, 10, seed=0)
+    env.reset()
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 4, size=(64, 1024, 2))
+
+    def run():
+        for step in range(64):
+            env.step(actions[step])
+    return (run, 64 * 1024)
+
+
+def map_clone(size):
+    mmap = filled_map(size)
+    return (mmap.clone, 1)
+
+
+def state_for_player(size):
+    mmap = filled_map(size)
+    return (lambda: mmap.state_for_player(1), 1)
+
+
+def bitboard_clone(size):
+    from tron.bitboard import BitBoard
+    board = BitBoard.from_map(filled_map(size))
+    return (board.clone, 1)
+
+
+def bitboard_fill(size):
+    from tron.bitboard import BitBoard
+    board = BitBoard.from_map(filled_map(size))
+    return (lambda: board.reachable(1), 1)
+
+
+def chunked_state_around(size):
+    from tron.chunked import ChunkedMap
+    mmap = ChunkedMap(size, size)
+    mmap[size // 2, size // 2] = Tile.PLAYER_ONE_HEAD
+    return (lambda: mmap.state_around(1, (size // 2, size // 2), 12), 1)
+
+
+def sized_scenario(function, size):
+    """
+    Registers a scenario taking the size of the map as parameter.
+    """
+    SCENARIOS['{}_{}'.format(function.__name__, size)] = (lambda: function(size), 'calls/s', True)
+
+for size in (10, 50, 200):
+    sized_scenario(map_clone, size)
+    sized_scenario(state_for_player, size)
+    sized_scenario(bitboard_clone, size)
+    sized_scenario(bitboard_fill, size)
+
+for size in (10, 200, 2000):
+    sized_scenario(chunked_state_around, size)
+
+
+@scenario('starts/s')
+def headless_start():
+    """
+    Cold start of a process importing the core of tron and playing a game,
+    which must not load pygame nor torch.
+    """
+    import os
+    import subprocess
+    code = '; '.join([
+        'from tron.game import Game, PositionPlayer',
+        'from tron.player import Direction, ConstantPlayer',
+        'Game(10, 10, [PositionPlayer(1, ConstantPlayer(Direction.RIGHT), [0, 0]), '
+        'PositionPlayer(2, ConstantPlayer(Direction.LEFT), [9, 9])]).main_loop()',
+    ])
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return (lambda: subprocess.run([sys.executable, '-c', code], cwd=directory, check=True), 1)
+
+
+@scenario('calls/s')
+def ai_action():
+    import torch
+    from ais.perceptron.ai import Ai
+    ai = Ai(perceptron_net())
+    mmap = filled_map(10)
+
+    def run():
+        with torch.no_grad():
+            ai.action(mmap, 1)
+    return (run, 1)
+
+
+@scenario('calls/s')
+def numpy_ai_action():
+    import os
+    import tempfile
+    from ais.perceptron.export import export
+    from ais.perceptron.numpy_ai import NumpyAi, NumpyNet
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ai.npz')
+        export(perceptron_net(), path)
+        ai = NumpyAi(NumpyNet(path))
+    mmap = filled_map(10)
+    return (lambda: ai.action(mmap, 1), 1)
+
+
+@scenario('samples/s')
+def train_step():
+    import torch
+    import torch.nn as nn
+    import torch.optim as optim
+    from training.targets import n_step_returns, q_targets
+
+    net = perceptron_net()
+    criterion = nn.MSELoss()
+    optimizer = optim.SGD(net.parameters(), lr=4e-3, momentum=0.9)
+    batch = 512
+    generator = torch.Generator().manual_seed(0)
+    inputs = torch.randint(-1, 2, (batch, 1, 12, 12), generator=generator).float()
+    actions = torch.randint(0, 4, (batch,), generator=generator)
+    rewards = torch.zeros(batch)
+    dones = torch.rand(batch, generator=generator) < 0.1
+
+    def run():
+        pred_q_values = net(inputs)
+        max_outputs = pred_q_values.max(dim=1)[0]
+        target_q_values = q_targets(pred_q_values, actions, n_step_returns(rewards, dones, max_outputs.roll(-1), 0.9))
+        net.zero_grad()
+        criterion(pred_q_values, target_q_values).backward()
+        optimizer.step()
+    return (run, batch)
+
+
+def run_scenarios(names):
+    results = {}
+    for name in names:
+        (setup, unit, higher_is_better) = SCENARIOS[name]
+        random.seed(0)
+        (function, units) = setup()
+        value = units / measure(function)
+        results[name] = {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+        print('{:<24} {:>14.1f} {}'.format(name, value, unit))
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the change of each scenario compared to a baseline, and returns the
+    names of the scenarios that are slower by more than threshold.
+    """
+    regressions = []
+    print()
+    print('{:<24} {:>14} {:>14} {:>8}'.format('scenario', 'baseline', 'current', 'change'))
+    for (name, result) in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['value']
+        change = result['value'] / before - 1
+        if not result['higher_is_better']:
+            change = -change
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = ' REGRESSION'
+        print('{:<24} {:>14.1f} {:>14.1f} {:>+7.1%}{}'.format(name, before, result['value'], change, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the hot paths of pytron.')
+    parser.add_argument('scenarios', nargs='*', help='scenarios to run, all of them by default')
+    parser.add_argument('--list', action='store_true', help='list the scenarios and exit')
+    parser.add_argument('--output', help='save the results as JSON to this file')
+    parser.add_argument('--compare', help='compare the results to a JSON file saved with --output')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown above which a scenario is a regression')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(SCENARIOS))
+        return 0
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario {}'.format(name))
+
+    results = run_scenarios(names)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'scenarios': results,
+            }, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['scenarios']
+        if compare(results, baseline, args.threshold):
+            return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
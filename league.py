@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import argparse
+from functools import partial
+
+from tron.player import Direction, ConstantPlayer
+from tron.tournament import Tournament
+from ais.alphabeta.ai import Ai as AlphaBetaAi
+
+# This script compares players by making each of them play against all the
+# others, on many random start positions and with the sides swapped. The games
+# are played in parallel, and the standings are printed as the results arrive.
+#
+# The players are given as factories, which must be picklable to be sent to
+# the other processes: add yours to the dictionary below.
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays a round-robin tournament between players.')
+    parser.add_argument('--games', type=int, default=100, help='number of games per pair of players, even')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes, all the processors by default')
+    parser.add_argument('--size', type=int, default=10, help='width and height of the map')
+    args = parser.parse_args()
+
+    factories = {
+        'up': partial(ConstantPlayer, Direction.UP),
+        'right': partial(ConstantPlayer, Direction.RIGHT),
+        'down': partial(ConstantPlayer, Direction.DOWN),
+        'left': partial(ConstantPlayer, Direction.LEFT),
+        'alphabeta': AlphaBetaAi,
+    }
+
+    try:
+        from ais.perceptron.ai import Ai
+        factories['perceptron'] = Ai
+    except ImportError:
+        pass
+
+    tournament = Tournament(factories, args.size, args.size, args.games, workers=args.workers)
+    for _ in tournament.run():
+        print('\n' + tournament.standings(), flush=True)
+
+if __name__ == '__main__':
+    main()
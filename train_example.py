@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
-import pygame
-
+import argparse
+import atexit
 import random
 
 import torch
@@ -10,9 +10,13 @@ import torch.nn as nn
 
 import numpy as np
 
-from tron.game import Game, PositionPlayer
+from tron.game import GamePool
+
+from ais.perceptron.ai import Ai, Net, models
 
-from ais.perceptron.ai import Ai, Net
+from training.actors import ActorPool, game_trajectory
+from training.checkpoint import CheckpointWriter
+from training.targets import n_step_returns, q_targets
 
 # Randomly initialize a player's position on the map
 def init_player_position(width, height):
@@ -21,8 +25,8 @@ def init_player_position(width, height):
     return [init_player_X, init_player_Y]
 
 
-# Simulate a game
-def play(width, height):
+# Simulate a game, with a game of the pool
+def play(game_pool, width, height):
 
     # Initialize players' position
     init_player_1 = init_player_position(width, height)
@@ -32,12 +36,9 @@ def play(width, height):
     while init_player_1[0] == init_player_2[0] and init_player_1[1] == init_player_2[1]:
         init_player_2 = init_player_position(width, height)
 
-    # Create a game from its size and its players
-    game = Game(width, height, [
-        # We create two PositionPlayer for each player of the game.
-        PositionPlayer(1, Ai(), init_player_1),
-        PositionPlayer(2, Ai(), init_player_2)
-    ])
+    # Get a game from the pool, which reuses the players and the map of a
+    # previous game if there is one
+    game = game_pool.acquire([init_player_1, init_player_2])
 
     # Run the game.
     game.main_loop()
@@ -46,10 +47,7 @@ def play(width, height):
 
 
 # Q-learning
-def main():
-    # Initialize the game engine
-    pygame.init()
-
+def main(actors = 0):
     # Prepare the size for the game.
     width = 10
     height = 10
@@ -58,12 +56,22 @@ def main():
 
     # Hyperparameters
     gamma = 0.9  # discount factor, used to balance between immediate and future rewards
+    n_steps = 1  # number of rewards summed before using the predicted Q-value of a state
     learning_rate = 4e-3
     momentum = 0.9
+    publish_every = 10  # number of games between two updates of the workers' weights
 
     # Initialize Neural Network
     net = Net()
-    torch.save(net.state_dict(), 'ais/' + ai_name + '/ai.bak')
+    models.publish('ais/' + ai_name + '/ai.bak', net.state_dict())
+
+    # Save the weights in the background, at most every 10 seconds
+    checkpoints = CheckpointWriter('ais/' + ai_name + '/ai.bak', every_seconds=10, on_commit=models.mark_loaded)
+    checkpoints.save(net.state_dict())
+    atexit.register(checkpoints.close)
+
+    # The games played, whose two players are Ai using the published weights
+    game_pool = GamePool(width, height, [Ai, Ai])
 
     # Initialize Optimizer
     criterion = nn.MSELoss()
@@ -73,58 +81,50 @@ def main():
     moyenne_duration = 0
     moyenne_loss = 0
 
-    while 1:
+    # Play the games in worker processes if asked to
+    pool = None
+    if actors > 0:
+        pool = ActorPool(net, actors, width, height)
+        pool.start()
+        atexit.register(pool.close)
 
-        # Data structures used for learning
-        states = []  # maps of the game
-        actions = []  # actions taken
-        rewards = []  # immediate rewards obtained
+    while 1:
 
-        # Play a game
-        game = play(width, height)
+        if pool is None:
+            # Play a game
+            game = play(game_pool, width, height)
+            trajectory = game_trajectory(game)
+            game_pool.release(game)
+        else:
+            # Get a game played by a worker
+            trajectory = pool.get()
 
         # Game duration is the length of history - 1 (the last element is the final state of the game)
-        game_duration = len(game.history) - 1
-
-        # For each player
-        for p in range(1, 3):
-
-            # For each action
-            for step in range(0, game_duration):
-                # Get player action at this step
-                if p == 1:
-                    actions.append(game.history[step].player_one_direction.value - 1)
-                elif p == 2:
-                    actions.append(game.history[step].player_two_direction.value - 1)
-
-                # Get game state at this step
-                states.append(game.history[step].map.state_for_player(p))
-
-                # Get player reward for the action taken at this step
-                # cf. Slide 6 from Reinforcement Learning class: "Classical version"
-                if step < game_duration - 1:
-                    rewards.append(0)
-                elif game.winner == p:
-                    rewards.append(1)
-                else:
-                    rewards.append(-1)
-
-        inputs = np.reshape(states, (len(states), 1, width + 2, height + 2))
-        inputs = torch.from_numpy(inputs).float()
+        game_duration = trajectory.duration
+
+        # A game ended by a strategy failing on the first frame has no step
+        # to learn from
+        if game_duration == 0:
+            continue
+
+        # Data used for learning, the steps of player one then of player two
+        states = trajectory.states.reshape(-1, 1, height + 2, width + 2)  # maps of the game
+        actions = torch.from_numpy(trajectory.actions.reshape(-1).astype(np.int64))  # actions taken
+        rewards = torch.from_numpy(trajectory.rewards.reshape(-1))  # immediate rewards obtained
+        dones = torch.zeros(2, game_duration, dtype=torch.bool)  # whether the step ends the game
+        dones[:, -1] = True
+        dones = dones.reshape(-1)
+
+        inputs = torch.from_numpy(states).float()
 
         # Compute predicted Q-values for each step and find the maximal predicted Q-value
         pred_q_values = net(inputs)
         max_outputs = pred_q_values.max(dim=1)[0]
 
-        # Copy predicted Q-values into target Q_values
-        target_q_values = pred_q_values.clone().detach()
-
-        # Apply Bellman equation to determine the target Q_value for the action that was taken
-        for aux in range(0, len(actions)):
-            if abs(rewards[aux]) == 1:
-                target_q_values[aux, actions[aux]] = rewards[aux]
-            else:
-                target_q_values[aux, actions[aux]] = rewards[aux] + gamma * max_outputs[aux + 1]
+        # Apply Bellman equation to determine the target Q_value for the action that was taken,
+        # the next state of a step being the following step of the same player
+        returns = n_step_returns(rewards, dones, max_outputs.roll(-1), gamma, n_steps)
+        target_q_values = q_targets(pred_q_values, actions, returns)
 
         # zero the parameter gradients
         net.zero_grad()
@@ -139,7 +139,10 @@ def main():
         optimizer.step()
 
         games = games + 1
-        torch.save(net.state_dict(), 'ais/' + ai_name + '/ai.bak')
+        checkpoints.step(net.state_dict())
+        models.publish('ais/' + ai_name + '/ai.bak', net.state_dict())
+        if pool is not None and games % publish_every == 0:
+            pool.publish(net.state_dict())
 
         nombre_echant = 1500
         if (games == 1):
@@ -156,4 +159,7 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--actors', type=int, default=0,
+                        help='number of worker processes playing the games, 0 to play them in the learner')
+    main(parser.parse_args().actors)
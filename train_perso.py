@@ -1,18 +1,20 @@
 #!/usr/bin/env python3
 
-import pygame
-
+import atexit
 import random
 
 import torch
 import torch.optim as optim
 import torch.nn as nn
 
-import numpy as np
+from tron.game import GamePool
 
-from tron.game import Game, PositionPlayer
+from ais.perceptron.ai import Ai, Net, models
 
-from ais.perceptron.ai import Ai, Net
+from training.actors import game_trajectory
+from training.checkpoint import CheckpointWriter
+from training.memory import ReplayMemory
+from training.targets import n_step_returns, q_targets
 
 # Randomly initialize a player's position on the map
 def init_player_position(width, height):
@@ -21,8 +23,8 @@ def init_player_position(width, height):
     return [init_player_X, init_player_Y]
 
 
-# Simulate a game
-def play(width, height):
+# Simulate a game, with a game of the pool
+def play(game_pool, width, height):
 
     # Initialize players' position
     init_player_1 = init_player_position(width, height)
@@ -32,12 +34,9 @@ def play(width, height):
     while init_player_1[0] == init_player_2[0] and init_player_1[1] == init_player_2[1]:
         init_player_2 = init_player_position(width, height)
 
-    # Create a game from its size and its players
-    game = Game(width, height, [
-        # We create two PositionPlayer for each player of the game.
-        PositionPlayer(1, Ai(), init_player_1),
-        PositionPlayer(2, Ai(), init_player_2)
-    ])
+    # Get a game from the pool, which reuses the players and the map of a
+    # previous game if there is one
+    game = game_pool.acquire([init_player_1, init_player_2])
 
     # Run the game.
     game.main_loop()
@@ -47,9 +46,6 @@ def play(width, height):
 
 # Q-learning
 def main():
-    # Initialize the game engine
-    pygame.init()
-
     # Prepare the size for the game.
     width = 10
     height = 10
@@ -63,7 +59,15 @@ def main():
 
     # Initialize Neural Network
     net = Net()
-    torch.save(net.state_dict(), 'ais/' + ai_name + '/ai.bak')
+    models.publish('ais/' + ai_name + '/ai.bak', net.state_dict())
+
+    # Save the weights in the background, at most every 10 seconds
+    checkpoints = CheckpointWriter('ais/' + ai_name + '/ai.bak', every_seconds=10, on_commit=models.mark_loaded)
+    checkpoints.save(net.state_dict())
+    atexit.register(checkpoints.close)
+
+    # The games played, whose two players are Ai using the published weights
+    game_pool = GamePool(width, height, [Ai, Ai])
 
     # Initialize Optimizer
     criterion = nn.MSELoss()
@@ -74,111 +78,44 @@ def main():
     moyenne_loss = 0
 
     max_minibatch = 10000
+    taille_subsect_minibatch = 500
 
-    # Data structures used for learning
-    states = []  # maps of the game
-    actions = []  # actions taken
-    rewards = []  # immediate rewards obtained
+    # Replay memory of the last transitions played, used for learning
+    memory = ReplayMemory(max_minibatch, (height + 2, width + 2))
 
     while 1:
 
 
         # Play a game
-        game = play(width, height)
+        game = play(game_pool, width, height)
+        trajectory = game_trajectory(game)
+        game_pool.release(game)
 
         # Game duration is the length of history - 1 (the last element is the final state of the game)
-        game_duration = len(game.history) - 1
-
-        # For each player
-        for p in range(1, 3):
-
-            # For each action
-            for step in range(0, game_duration):
-                # Get player action at this step
-                if p == 1:
-                    if len(actions) < max_minibatch:
-                        actions.append(game.history[step].player_one_direction.value - 1)
-                    else:
-                        actions[games%max_minibatch] = game.history[step].player_one_direction.value - 1
-                    #actions.append(game.history[step].player_one_direction.value - 1)
-                elif p == 2:
-                    if len(actions) < max_minibatch:
-                        actions.append(game.history[step].player_two_direction.value - 1)
-                    else:
-                        actions[games%max_minibatch] = game.history[step].player_two_direction.value - 1
-                    #actions.append(game.history[step].player_two_direction.value - 1)
-
-                # Get game state at this step
-                if len(states) < max_minibatch:
-                    states.append(game.history[step].map.state_for_player(p))
-                else:
-                    states[games%max_minibatch] = game.history[step].map.state_for_player(p)
-                #states.append(game.history[step].map.state_for_player(p))
-                
-                # Get player reward for the action taken at this step
-                # cf. Slide 6 from Reinforcement Learning class: "Classical version"
-                if step < game_duration - 1:
-                    if len(rewards) < max_minibatch:
-                        rewards.append(0)
-                    else:
-                        rewards[games%max_minibatch] = 0
-                    #rewards.append(0)
-                elif game.winner == p:
-                    if len(rewards) < max_minibatch:
-                        rewards.append(1)
-                    else:
-                        rewards[games%max_minibatch] = 1
-                    #rewards.append(1)
-                else:
-                    if len(rewards) < max_minibatch:
-                        rewards.append(-1)
-                    else:
-                        rewards[games%max_minibatch] = -1
-                    #rewards.append(-1)
-
-        #utiliser sample de random ! retenir dans une liste et prendre dans la subsec
-        #que les mêmes indices pour rewards, actions, et states sinon ça sera pas 
-        #coordonné
-        
-        taille_subsect_minibatch = 500
-        liste_indice = range(taille_subsect_minibatch)
-        subsect_minibatch = []
-        i = len(states)
-        if i < taille_subsect_minibatch:
-            for a in range(0, len(states)):
-                subsect_minibatch.append([states[a], actions[a], rewards[a]])
-        else:
-            liste_alea_indice = random.sample(liste_indice, taille_subsect_minibatch)
-            for a in range(0, len(liste_alea_indice)):
-                subsect_minibatch.append([states[liste_alea_indice[a]], actions[liste_alea_indice[a]], rewards[liste_alea_indice[a]]])
-        
-        #print('taille states : [%5d], taille subsecminibatch : [%5d]' % (len(states), len(subsect_minibatch)))
-        #construction des états pour le inputs
-        states_inputs = []
-        for c in range(0,len(subsect_minibatch)):
-            states_inputs.append(subsect_minibatch[c][0])
-        inputs = np.reshape(states_inputs, (len(subsect_minibatch), 1, width + 2, height + 2))
-        inputs = torch.from_numpy(inputs).float()
-
-        # Compute predicted Q-values for each step and find the maximal predicted Q-value
-        pred_q_values = net(inputs)
-        max_outputs = pred_q_values.max(dim=1)[0]
+        game_duration = trajectory.duration
 
-        # Copy predicted Q-values into target Q_values
-        target_q_values = pred_q_values.clone().detach()
+        # Store the transitions of each player, one game after the other
+        if game_duration > 0:
+            for p in range(0, 2):
+                memory.add_trajectory(trajectory.states[p], trajectory.actions[p], trajectory.rewards[p])
 
-        # Apply Bellman equation to determine the target Q_value for the action that was taken
+        # Nothing can be learnt until the memory has transitions, if the first
+        # games ended by a strategy failing on the first frame
+        if len(memory) == 0:
+            continue
+
+        # Sample a minibatch uniformly in the whole memory
+        (states, actions, rewards, next_states, dones) = memory.sample(min(len(memory), taille_subsect_minibatch))
+        inputs = states.unsqueeze(1).float()
 
-        #juste changer le for pour parcourir le subsec batch
-        for aux in range(0, len(subsect_minibatch) - 1):
-            if abs(subsect_minibatch[aux][2]) == 1:
-                target_q_values[aux, subsect_minibatch[aux][1]] = subsect_minibatch[aux][2]
-            else:
-                #print('actions[aux] : %3.3f, aux : %5d' % (actions[aux], aux))
-                rew = subsect_minibatch[aux][2]
-                maxx = max_outputs[aux + 1]
-                #target_q_values[aux, subsect_minibatch[aux][1]] = subsect_minibatch[aux][2] + gamma * max_outputs[aux + 1]
-                target_q_values[aux, subsect_minibatch[aux][1]] = rew + gamma * maxx
+        # Compute predicted Q-values for each step, and the maximal predicted Q-value of the next states
+        pred_q_values = net(inputs)
+        with torch.no_grad():
+            max_outputs = net(next_states.unsqueeze(1).float()).max(dim=1)[0]
+
+        # Apply Bellman equation to determine the target Q_value for the action that was taken
+        returns = n_step_returns(rewards, dones, max_outputs, gamma)
+        target_q_values = q_targets(pred_q_values, actions, returns)
 
         # zero the parameter gradients
         net.zero_grad()
@@ -193,7 +130,8 @@ def main():
         optimizer.step()
 
         games = games + 1
-        torch.save(net.state_dict(), 'ais/' + ai_name + '/ai.bak')
+        checkpoints.step(net.state_dict())
+        models.publish('ais/' + ai_name + '/ai.bak', net.state_dict())
 
         nombre_echant = 1000
         if (games == 1):
@@ -201,7 +139,8 @@ def main():
             moyenne_loss = loss
             #print('[%5d] average loss: %.3f, average duration: %3.3f' % (games, moyenne_loss, moyenne_duration))
         elif (games%nombre_echant == 0):
-            print('[%5d] average loss: %.3f, average duration: %3.3f' % (games, moyenne_loss/nombre_echant, moyenne_duration//nombre_echant))
+            print('[%5d] average loss: %.3f, average duration: %3.3f' % (
+                games, moyenne_loss/nombre_echant, moyenne_duration//nombre_echant))
             moyenne_duration = 0
             moyenne_loss = 0
         else:
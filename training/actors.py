@@ -0,0 +1,156 @@
+"""
+This module contains the ActorPool, that runs self-play games in worker
+processes for a central learner.
+"""
+
+from collections import namedtuple
+import queue
+import random
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+
+from tron.game import GamePool
+
+from ais.perceptron.ai import Ai, Net
+
+
+Trajectory = namedtuple('Trajectory', ['states', 'actions', 'rewards', 'winner', 'duration'])
+Trajectory.__doc__ = """
+The data of a finished game needed for learning.
+
+states is an int8 array of shape (2, duration, height + 2, width + 2) with the
+perception of each player at each step, actions and rewards are int8 arrays of
+shape (2, duration) with the values of the directions minus one, and the
+rewards of the players.
+"""
+
+
+def random_positions(width, height):
+    """
+    Returns two distinct random start positions.
+    """
+    while True:
+        positions = [[random.randint(0, width - 1), random.randint(0, height - 1)] for _ in range(2)]
+        if positions[0] != positions[1]:
+            return positions
+
+
+def game_trajectory(game):
+    """
+    Returns the Trajectory of a finished game.
+    """
+    arrays = game.trajectory()
+    return Trajectory(
+        np.ascontiguousarray(arrays.observations.swapaxes(0, 1)),
+        np.ascontiguousarray(arrays.actions.T),
+        arrays.rewards.T.astype(np.int8),
+        game.winner,
+        len(arrays.actions))
+
+
+def _actor(seed, shared, version, lock, trajectories, stop, width, height):
+    torch.set_num_threads(1)
+    random.seed(seed)
+
+    net = Net()
+    current = -1
+    games = GamePool(width, height, [lambda: Ai(net)] * 2)
+
+    while not stop.is_set():
+        # Get the weights published by the learner
+        if version.value != current:
+            with lock:
+                net.load_state_dict(shared.state_dict())
+                current = version.value
+
+        game = games.acquire(random_positions(width, height))
+        with torch.no_grad():
+            game.main_loop()
+
+        trajectory = game_trajectory(game) if len(game.history) >= 2 else None
+        games.release(game)
+        if trajectory is None:
+            continue
+
+        while not stop.is_set():
+            try:
+                trajectories.put(trajectory, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+
+
+class ActorPool:
+    """
+    This class runs self-play games in a pool of worker processes.
+
+    The workers play with their own copy of a net, that they update whenever
+    the learner publishes new weights, and send the trajectories of their games
+    back through a bounded queue.
+    """
+    def __init__(self, net, workers, width, height, queue_size = 256, seed = None):
+        """
+        Creates a pool of workers playing with the current weights of a net.
+        """
+        self.width = width
+        self.height = height
+        context = mp.get_context('spawn')
+
+        self._shared = Net()
+        self._shared.load_state_dict(net.state_dict())
+        self._shared.share_memory()
+        self._version = context.Value('l', 0)
+        self._lock = context.Lock()
+        self._stop = context.Event()
+        self.trajectories = context.Queue(queue_size)
+
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self._processes = [
+            context.Process(
+                target=_actor,
+                args=(seed + i, self._shared, self._version, self._lock, self.trajectories, self._stop, width, height),
+                daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self):
+        """
+        Starts the workers.
+        """
+        for process in self._processes:
+            process.start()
+
+    def publish(self, state_dict):
+        """
+        Publishes new weights, that the workers will use from their next game.
+        """
+        with self._lock:
+            self._shared.load_state_dict(state_dict)
+            self._version.value += 1
+
+    def get(self, timeout = None):
+        """
+        Returns the next Trajectory played by a worker.
+        """
+        return self.trajectories.get(timeout=timeout)
+
+    def close(self, timeout = 10):
+        """
+        Stops the workers, terminating the ones that have not exited after
+        timeout seconds.
+        """
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,148 @@
+"""
+This module contains the CheckpointWriter, that saves network weights in the
+background during training.
+"""
+
+from time import monotonic
+import os
+import shutil
+import threading
+
+import torch
+
+
+class CheckpointWriter:
+    """
+    This class writes checkpoints of a network from a background thread.
+
+    The state dict is copied when a checkpoint is taken, so that the training
+    can go on while the copy is written to a temporary file, which is then
+    renamed to the checkpoint path so that readers never see a partial file.
+    If checkpoints are taken faster than they are written, only the most
+    recent one is kept.
+    """
+    def __init__(self, path, every_games = None, every_seconds = None, keep_last = 0, on_commit = None):
+        """
+        Creates a writer for a checkpoint path.
+
+        step takes a checkpoint every every_games games and/or every
+        every_seconds seconds, or after every game if neither is set.
+        The keep_last previous checkpoints are also kept as path.<number>.
+        on_commit is called with the path from the writer thread once a
+        checkpoint is on the disk.
+        """
+        self.path = path
+        self.every_games = every_games
+        self.every_seconds = every_seconds
+        self.keep_last = keep_last
+        self.on_commit = on_commit
+
+        self.games = 0
+        self.count = 0
+        self._last_games = 0
+        self._last_time = monotonic()
+        self._kept = []
+        self.error = None
+
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def step(self, state_dict):
+        """
+        Counts a game, and takes a checkpoint if the policy says so.
+
+        Returns whether a checkpoint has been taken.
+        """
+        self.games += 1
+        due = self.every_games is None and self.every_seconds is None
+        if self.every_games is not None and self.games - self._last_games >= self.every_games:
+            due = True
+        if self.every_seconds is not None and monotonic() - self._last_time >= self.every_seconds:
+            due = True
+        if due:
+            self.save(state_dict)
+        return due
+
+    def save(self, state_dict):
+        """
+        Takes a checkpoint of a state dict, that will be written in the background.
+        """
+        snapshot = {k: v.detach().to('cpu', copy=True) for (k, v) in state_dict.items()}
+        self._last_games = self.games
+        self._last_time = monotonic()
+        with self._condition:
+            self._pending = snapshot
+            self._condition.notify_all()
+
+    def flush(self):
+        """
+        Waits until the checkpoints taken so far are written.
+
+        Raises the last error that happened while writing, if any.
+        """
+        with self._condition:
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """
+        Writes the last checkpoint and stops the writer thread.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                snapshot = self._pending
+                self._pending = None
+                self._writing = True
+
+            try:
+                self._write(snapshot)
+            except Exception as e:
+                self.error = e
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, snapshot):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            torch.save(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.count += 1
+
+        if self.keep_last > 0:
+            kept = '{}.{}'.format(self.path, self.count)
+            try:
+                os.link(self.path, kept)
+            except OSError:
+                shutil.copyfile(self.path, kept)
+            self._kept.append(kept)
+            while len(self._kept) > self.keep_last:
+                os.remove(self._kept.pop(0))
+
+        if self.on_commit is not None:
+            self.on_commit(self.path)
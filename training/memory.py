@@ -0,0 +1,112 @@
+"""
+This module contains the ReplayMemory, a ring buffer of transitions to learn from.
+"""
+
+import numpy as np
+import torch
+
+
+class ReplayMemory:
+    """
+    This class stores the last transitions played in preallocated arrays.
+
+    Each transition has a state, the action taken, the reward obtained, whether
+    it ends its game, and the index of the transition that follows it, whose
+    state is the next state. The transitions of a game must be added in order,
+    so that the next transition is the one in the next slot.
+
+    The arrays can be backed by files, so that the memory can exceed the RAM.
+    """
+    def __init__(self, capacity, state_shape, path = None, seed = None):
+        """
+        Creates an empty memory of capacity transitions.
+
+        If path is given, the arrays are memory-mapped to the files
+        path.states.npy, path.actions.npy and so on.
+        """
+        self.capacity = capacity
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+        def allocate(name, shape, dtype):
+            if path is None:
+                return np.zeros(shape, dtype=dtype)
+            return np.lib.format.open_memmap('{}.{}.npy'.format(path, name), mode='w+', dtype=dtype, shape=shape)
+
+        self.states = allocate('states', (capacity,) + tuple(state_shape), np.int8)
+        self.actions = allocate('actions', (capacity,), np.int8)
+        self.rewards = allocate('rewards', (capacity,), np.float32)
+        self.next_indices = allocate('next_indices', (capacity,), np.int64)
+        self.dones = allocate('dones', (capacity,), np.bool_)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, done):
+        """
+        Adds a transition, replacing the oldest one if the memory is full.
+        """
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.next_indices[i] = (i + 1) % self.capacity
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_trajectory(self, states, actions, rewards, dones = None):
+        """
+        Adds the transitions of a game at once.
+
+        If dones is None, only the last transition ends the game.
+        """
+        count = len(actions)
+        if dones is None:
+            dones = np.zeros(count, dtype=np.bool_)
+            dones[-1] = True
+        if count > self.capacity:
+            (states, actions, rewards, dones) = (a[-self.capacity:] for a in (states, actions, rewards, dones))
+            count = self.capacity
+
+        indices = (self.position + np.arange(count)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.dones[indices] = dones
+        self.next_indices[indices] = (indices + 1) % self.capacity
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def sample_indices(self, batch_size):
+        """
+        Returns the indices of batch_size transitions drawn uniformly.
+
+        The last transition added is left out if it does not end its game,
+        since its next state is not known yet.
+        """
+        last = (self.position - 1) % self.capacity
+        if self.size == 0 or (self.size == 1 and not self.dones[last]):
+            raise ValueError('not enough transitions to sample from')
+        if self.dones[last]:
+            return self.rng.integers(0, self.size, size=batch_size)
+        indices = self.rng.integers(0, self.size - 1, size=batch_size)
+        return indices + (indices >= last)
+
+    def sample(self, batch_size):
+        """
+        Returns a batch of transitions drawn uniformly, as tensors.
+
+        Returns the states, the actions, the rewards, the next states and the
+        done flags. The next state of a transition that ends its game is
+        meaningless.
+        """
+        indices = self.sample_indices(batch_size)
+        return (
+            torch.from_numpy(self.states[indices]),
+            torch.from_numpy(self.actions[indices].astype(np.int64)),
+            torch.from_numpy(self.rewards[indices]),
+            torch.from_numpy(self.states[self.next_indices[indices]]),
+            torch.from_numpy(self.dones[indices]),
+        )
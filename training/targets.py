@@ -0,0 +1,48 @@
+"""
+This module contains the computation of the target Q-values used for learning.
+"""
+
+import torch
+
+
+def n_step_returns(rewards, dones, next_values, gamma, n = 1):
+    """
+    Returns the n-step returns of consecutive transitions.
+
+    rewards, dones and next_values are 1D tensors, next_values[t] being the
+    value of the state reached by transition t, usually the maximal predicted
+    Q-value of that state. The transitions of a game must be consecutive, and
+    the last transition of a game must be done. The return of transition t is
+    the discounted sum of the rewards of the next n transitions of its game,
+    plus the discounted value of the state reached after them if the game is
+    not finished by then.
+    """
+    count = len(rewards)
+    rewards = rewards.float()
+    next_values = next_values.detach().float()
+    steps = torch.arange(count)
+
+    returns = torch.zeros(count)
+    discount = torch.ones(count)
+    last = steps
+    running = torch.ones(count, dtype=torch.bool)
+    for k in range(n):
+        index = steps + k
+        running = running & (index < count)
+        index = index.clamp(max=count - 1)
+        returns = returns + torch.where(running, discount * rewards[index], torch.zeros(count))
+        last = torch.where(running, index, last)
+        discount = torch.where(running, discount * gamma, discount)
+        running = running & ~dones[index]
+
+    return returns + torch.where(dones[last], torch.zeros(count), discount * next_values[last])
+
+
+def q_targets(pred_q_values, actions, returns):
+    """
+    Returns the target Q-values, that are the predicted ones, except for the
+    action taken at each step, whose target is its return.
+    """
+    targets = pred_q_values.detach().clone()
+    targets[torch.arange(len(actions)), actions] = returns
+    return targets
@@ -0,0 +1,49 @@
+from time import perf_counter
+import unittest
+
+import numpy as np
+import torch
+
+from ais.perceptron.ai import Net
+from training.actors import ActorPool
+
+def constant_net(action):
+    """
+    Returns a net that always chooses the direction of value action + 1.
+    """
+    net = Net()
+    with torch.no_grad():
+        for parameter in net.parameters():
+            parameter.zero_()
+        net.fc3.bias[action] = 1
+    return net
+
+class TestActorPool(unittest.TestCase):
+    def test_publish(self):
+        pool = ActorPool(constant_net(0), 2, 10, 10, queue_size=4, seed=0)
+        with pool:
+            for _ in range(4):
+                trajectory = pool.get(timeout=60)
+                self.assertTrue(np.all(trajectory.actions == 0))
+                self.assertEqual(trajectory.states.shape, (2, trajectory.duration, 12, 12))
+                self.assertEqual(trajectory.states.dtype, np.int8)
+
+            pool.publish(constant_net(2).state_dict())
+            self.assertEqual(pool._version.value, 1)
+
+            # The games played before the new weights are still in the queue
+            deadline = perf_counter() + 60
+            while True:
+                self.assertLess(perf_counter(), deadline)
+                trajectory = pool.get(timeout=60)
+                if np.all(trajectory.actions == 2):
+                    break
+                self.assertTrue(np.all(trajectory.actions == 0))
+
+        for process in pool._processes:
+            self.assertFalse(process.is_alive())
+            self.assertEqual(process.exitcode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+import torch
+
+from training.checkpoint import CheckpointWriter
+
+class TestCheckpointWriter(unittest.TestCase):
+    def test_policy(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'ai.bak')
+        commits = []
+        with CheckpointWriter(path, every_games=3, keep_last=2, on_commit=commits.append) as writer:
+            taken = [writer.step({'w': torch.full((2,), float(game))}) for game in range(9)]
+        self.assertEqual(taken, [False, False, True] * 3)
+        self.assertEqual(commits, [path] * writer.count)
+        self.assertEqual(torch.load(path)['w'].tolist(), [8.0, 8.0])
+        self.assertFalse(os.path.exists(path + '.tmp'))
+        kept = sorted(name for name in os.listdir(directory) if name != 'ai.bak')
+        self.assertLessEqual(len(kept), 2)
+
+    def test_snapshot(self):
+        path = os.path.join(tempfile.mkdtemp(), 'ai.bak')
+        weights = torch.zeros(3)
+        writer = CheckpointWriter(path)
+        writer.save({'w': weights})
+        weights += 1
+        writer.flush()
+        writer.close()
+        self.assertEqual(torch.load(path)['w'].tolist(), [0.0, 0.0, 0.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from training.memory import ReplayMemory
+
+class TestReplayMemory(unittest.TestCase):
+    def fill(self, memory, games, duration):
+        for game in range(games):
+            states = (game + 10 * np.arange(duration)).astype(np.int8)[:, None, None] * np.ones((1, 2, 2), dtype=np.int8)
+            memory.add_trajectory(states, np.arange(duration) % 4, np.zeros(duration))
+
+    def test_next_states(self):
+        memory = ReplayMemory(7, (2, 2), seed=0)
+        self.fill(memory, 5, 3)
+        self.assertEqual(len(memory), 7)
+
+        (states, actions, rewards, next_states, dones) = memory.sample(1000)
+        following = next_states[:, 0, 0] == states[:, 0, 0] + 10
+        self.assertTrue(bool((dones | following).all()))
+        self.assertEqual(tuple(states.shape), (1000, 2, 2))
+
+    def test_pending_transition(self):
+        memory = ReplayMemory(5, (2, 2), seed=0)
+        self.fill(memory, 1, 3)
+        memory.add(np.zeros((2, 2)), 1, 0.0, False)
+        self.assertEqual(set(memory.sample_indices(1000).tolist()), {0, 1, 2})
+
+    def test_memory_mapped(self):
+        path = os.path.join(tempfile.mkdtemp(), 'memory')
+        memory = ReplayMemory(10, (2, 2), path=path)
+        self.fill(memory, 2, 3)
+        states = np.load(path + '.states.npy', mmap_mode='r')
+        self.assertEqual(states[3, 0, 0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
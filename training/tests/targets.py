@@ -0,0 +1,41 @@
+import unittest
+
+import torch
+
+from training.targets import n_step_returns, q_targets
+
+def reference_returns(rewards, dones, next_values, gamma, n):
+    returns = []
+    for t in range(len(rewards)):
+        total = 0.0
+        for k in range(n):
+            total += gamma ** k * rewards[t + k]
+            if dones[t + k] or k == n - 1 or t + k == len(rewards) - 1:
+                if not dones[t + k]:
+                    total += gamma ** (k + 1) * next_values[t + k]
+                break
+        returns.append(total)
+    return returns
+
+class TestTargets(unittest.TestCase):
+    def test_n_step_returns(self):
+        torch.manual_seed(0)
+        rewards = torch.randn(20)
+        dones = torch.zeros(20, dtype=torch.bool)
+        dones[[4, 5, 11]] = True
+        next_values = torch.randn(20)
+        for n in range(1, 5):
+            expected = reference_returns(rewards.tolist(), dones.tolist(), next_values.tolist(), 0.9, n)
+            returns = n_step_returns(rewards, dones, next_values, 0.9, n)
+            for (a, b) in zip(returns.tolist(), expected):
+                self.assertAlmostEqual(a, b, places=5)
+
+    def test_q_targets(self):
+        pred = torch.zeros(3, 4, requires_grad=True)
+        targets = q_targets(pred, torch.tensor([0, 3, 1]), torch.tensor([1.0, 2.0, 3.0]))
+        self.assertFalse(targets.requires_grad)
+        self.assertEqual(targets.tolist(), [[1, 0, 0, 0], [0, 0, 0, 2], [0, 3, 0, 0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
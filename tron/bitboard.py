@@ -0,0 +1,253 @@
+"""
+This module contains the BitBoard class, a compact map for search algorithms.
+"""
+
+import numpy as np
+
+from tron.map import TileMap, Tile, template
+from tron.player import Direction
+
+
+def popcount(bits):
+    """
+    Returns the number of cells of a bitboard.
+    """
+    return bin(bits).count('1')
+
+# Python 3.10 has a much faster builtin
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+
+
+def to_bits(array):
+    """
+    Converts a flat boolean array into a bitboard, cell k being bit k.
+    """
+    return int.from_bytes(np.packbits(array, bitorder='little').tobytes(), 'little')
+
+
+def from_bits(bits, size):
+    """
+    Converts a bitboard into a flat boolean array of a size.
+    """
+    data = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(data, bitorder='little')[:size].astype(np.bool_)
+
+
+def fill(seeds, free, stride):
+    """
+    Returns the cells reachable from the cells of seeds through the cells of
+    free, for bitboards whose rows have stride bits and are surrounded by
+    cells that are never free.
+    """
+    reach = seeds & free
+    while True:
+        grown = (reach | (reach << 1) | (reach >> 1) | (reach << stride) | (reach >> stride)) & free
+        if grown == reach:
+            return reach
+        reach = grown
+
+
+class BitBoard:
+    """
+    A map of the game stored as bitboards, Python integers with a bit per cell.
+
+    Cell (x, y) of the map is bit (x + 1) * (height + 2) + y + 1, so that the
+    layout is the one of the inner array of a Map, border included. Since the
+    border is always occupied, moving a bitboard to the neighbour cells is a
+    simple shift, which cannot wrap from a row to the next without going
+    through the border.
+
+    The board keeps the occupied cells, the body of each player and the
+    position of its head as a cell index. Copying it only copies a few integers.
+    """
+    __slots__ = ('width', 'height', 'stride', 'size', 'mask', 'offsets', 'walls', 'occupied', 'bodies', 'heads')
+
+    def __init__(self, w, h, players = 2):
+        """
+        Creates an empty board, with walls on the borders.
+        """
+        self.width = w
+        self.height = h
+        self.stride = h + 2
+        self.size = (w + 2) * (h + 2)
+        self.mask = (1 << self.size) - 1
+        self.offsets = {
+            Direction.UP: -self.stride,
+            Direction.RIGHT: 1,
+            Direction.DOWN: self.stride,
+            Direction.LEFT: -1,
+        }
+
+        self.walls = to_bits(template(w, h, Tile.EMPTY.value, Tile.WALL.value, np.int8).ravel() == Tile.WALL.value)
+        self.occupied = self.walls
+        self.bodies = [0] * players
+        self.heads = [None] * players
+
+    def clone(self):
+        """
+        Creates a copy of the board.
+        """
+        clone = BitBoard.__new__(BitBoard)
+        clone.width = self.width
+        clone.height = self.height
+        clone.stride = self.stride
+        clone.size = self.size
+        clone.mask = self.mask
+        clone.offsets = self.offsets
+        clone.walls = self.walls
+        clone.occupied = self.occupied
+        clone.bodies = self.bodies[:]
+        clone.heads = self.heads[:]
+        return clone
+
+    def index(self, position):
+        """
+        Returns the index of the cell of a position.
+        """
+        return (position[0] + 1) * self.stride + position[1] + 1
+
+    def position(self, index):
+        """
+        Returns the position of the cell of an index.
+        """
+        (x, y) = divmod(index, self.stride)
+        return (x - 1, y - 1)
+
+    def is_free(self, index):
+        """
+        Returns whether a cell is empty.
+        """
+        return not (self.occupied >> index) & 1
+
+    def free(self):
+        """
+        Returns the bitboard of the empty cells.
+        """
+        return self.mask & ~self.occupied
+
+    def place(self, id, position):
+        """
+        Puts the head of player id on a position.
+        """
+        index = self.index(position)
+        self.heads[id - 1] = index
+        self.occupied |= 1 << index
+
+    def neighbours(self, bits):
+        """
+        Returns the bitboard of the neighbours of the cells of a bitboard.
+        """
+        s = self.stride
+        return ((bits << 1) | (bits >> 1) | (bits << s) | (bits >> s)) & self.mask
+
+    def fill(self, seeds, free = None):
+        """
+        Returns the cells reachable from the cells of seeds through free cells,
+        the empty cells by default, as a bitboard.
+
+        The seeds themselves are only part of the result if they are free.
+        """
+        if free is None:
+            free = self.free()
+        return fill(seeds, free, self.stride)
+
+    def reachable(self, id):
+        """
+        Returns the empty cells that player id can reach, as a bitboard.
+        """
+        return self.fill(self.neighbours(1 << self.heads[id - 1]))
+
+    def moves(self, id):
+        """
+        Returns the directions that lead player id to an empty cell.
+
+        A head on the border, the one of a player eliminated against it, has
+        neighbours outside of the board, which are never returned.
+        """
+        head = self.heads[id - 1]
+        occupied = self.occupied
+        size = self.size
+        return [d for (d, offset) in self.offsets.items()
+                if 0 <= head + offset < size and not (occupied >> (head + offset)) & 1]
+
+    def on_border(self, index):
+        """
+        Returns whether a cell is on the border of the board.
+        """
+        return bool((self.walls >> index) & 1)
+
+    def play(self, directions):
+        """
+        Moves all the players at once, as Game.next_frame does, and returns
+        whether each of them is still alive.
+
+        The previous heads become bodies, then a player dies if its new cell
+        is not empty or if another player lands on the same cell. The players
+        whose direction is None are eliminated players, which do not move.
+        """
+        occupied = self.occupied
+        heads = [head if direction is None else head + self.offsets[direction]
+                 for (head, direction) in zip(self.heads, directions)]
+        shared = len(set(heads)) < len(heads)
+        alive = [direction is not None and not (occupied >> head) & 1 and not (shared and heads.count(head) > 1)
+                 for (head, direction) in zip(heads, directions)]
+        for (k, head) in enumerate(heads):
+            if directions[k] is not None:
+                self.bodies[k] |= 1 << self.heads[k]
+                occupied |= 1 << head
+        self.heads = heads
+        self.occupied = occupied
+        return alive
+
+    def outcome(self, alive):
+        """
+        Returns the outcome of the game after a call to play: None if it goes
+        on, 0 for a draw, or the id of the winner.
+
+        As in Game.main_loop, the game is a draw if all the players died.
+        """
+        survivors = [k + 1 for (k, a) in enumerate(alive) if a]
+        if len(survivors) > 1:
+            return None
+        if not survivors:
+            return 0
+        return survivors[0]
+
+    @staticmethod
+    def from_map(mmap, players = None):
+        """
+        Creates a board from a Map.
+
+        If players is None, the board has as many players as the highest id
+        of the heads on the map, and at least 2.
+        """
+        codes = mmap.array()
+        if codes.dtype == object:
+            codes = np.vectorize(lambda tile: tile.value, otypes=[np.int8])(codes)
+        codes = codes.ravel()
+        if players is None:
+            players = max(2, int(codes.max()) // 2)
+
+        board = BitBoard(mmap.width, mmap.height, players)
+        board.occupied = to_bits(codes != Tile.EMPTY.value)
+        for id in range(1, players + 1):
+            board.bodies[id - 1] = to_bits(codes == Tile.body(id).value)
+            heads = np.flatnonzero(codes == Tile.head(id).value)
+            if len(heads):
+                board.heads[id - 1] = int(heads[0])
+        return board
+
+    def to_map(self):
+        """
+        Creates a TileMap from the board.
+        """
+        mmap = TileMap(self.width, self.height)
+        codes = mmap.array().reshape(-1)
+        codes[from_bits(self.walls, self.size)] = Tile.WALL.value
+        for (k, body) in enumerate(self.bodies):
+            codes[from_bits(body, self.size)] = Tile.body(k + 1).value
+        for (k, head) in enumerate(self.heads):
+            if head is not None:
+                codes[head] = Tile.head(k + 1).value
+        return mmap
@@ -0,0 +1,229 @@
+"""
+This module contains the ChunkedMap class, that stores large maps in chunks.
+"""
+
+import numpy as np
+
+from tron.map import TileMap, Tile
+
+
+class ChunkedMap(TileMap):
+    """
+    A tile map stored in square chunks of tiles, for large arenas.
+
+    The chunks split the inner array of a TileMap, borders included, and a
+    chunk is only allocated when one of its tiles is written: the tiles of the
+    other chunks are Tile.EMPTY in the inside and Tile.WALL on the borders.
+    The memory used, and the cost of clone and clear, only depend on the part
+    of the map that has been visited by the players.
+
+    The tiles can be read and written with the [] operator, with take and put,
+    and the observations around a position are read with crop and state_around
+    from the few chunks they cover. array and state_for_player still work,
+    but they build the whole board.
+    """
+    def __init__(self, w, h, chunk_size = 64):
+        """
+        Creates a new chunked map from its width, its height and the size of
+        the side of its chunks.
+        """
+        self.width = w
+        self.height = h
+        self.chunk_size = chunk_size
+        self.regions = None
+        self.observations = None
+        self.chunks = {}
+        self._blanks = {}
+        self._readonly = False
+
+    def _shape(self, ci, cj):
+        """
+        Returns the shape of chunk (ci, cj), the last chunks of the rows and
+        of the columns being cut by the borders.
+        """
+        c = self.chunk_size
+        return (min(c, self.width + 2 - ci * c), min(c, self.height + 2 - cj * c))
+
+    def _blank(self, ci, cj):
+        """
+        Returns the tiles of chunk (ci, cj) when it is not allocated.
+
+        The blank chunks only depend on the borders they contain, and are
+        built once for each of them. They must not be modified.
+        """
+        c = self.chunk_size
+        (w, h) = self._shape(ci, cj)
+        rows = tuple(i for i in (0, self.width + 1) if ci * c <= i < ci * c + w)
+        columns = tuple(j for j in (0, self.height + 1) if cj * c <= j < cj * c + h)
+        key = (w, h, rows, columns)
+        blank = self._blanks.get(key)
+        if blank is None:
+            blank = np.full((w, h), Tile.EMPTY.value, dtype=np.int8)
+            for i in rows:
+                blank[i - ci * c] = Tile.WALL.value
+            for j in columns:
+                blank[:, j - cj * c] = Tile.WALL.value
+            blank.flags.writeable = False
+            self._blanks[key] = blank
+        return blank
+
+    def _chunk(self, ci, cj):
+        """
+        Returns chunk (ci, cj) to write in it, allocating it if needed.
+        """
+        if self._readonly:
+            raise ValueError('the map is read-only')
+        chunk = self.chunks.get((ci, cj))
+        if chunk is None:
+            chunk = self._blank(ci, cj).copy()
+            self.chunks[(ci, cj)] = chunk
+        return chunk
+
+    def _read(self, ci, cj):
+        """
+        Returns the tiles of chunk (ci, cj), without allocating it.
+        """
+        chunk = self.chunks.get((ci, cj))
+        if chunk is None:
+            return self._blank(ci, cj)
+        return chunk
+
+    def clear(self):
+        """
+        Empties the map, by freeing all its chunks.
+        """
+        self.chunks.clear()
+
+    def copy_from(self, other):
+        """
+        Copies the tiles of another ChunkedMap of the same size into this one.
+        """
+        self.chunks = {key: chunk.copy() for (key, chunk) in other.chunks.items()}
+
+    def clone(self):
+        """
+        Creates a clone of the map, copying only its allocated chunks.
+        """
+        clone = ChunkedMap(self.width, self.height, self.chunk_size)
+        clone._blanks = self._blanks
+        clone.copy_from(self)
+        return clone
+
+    def view(self):
+        """
+        Returns a read-only map sharing the chunks of this one, which changes
+        with it.
+        """
+        view = ChunkedMap(self.width, self.height, self.chunk_size)
+        view._blanks = self._blanks
+        view.chunks = self.chunks
+        view._readonly = True
+        return view
+
+    def track_regions(self):
+        raise ValueError('the regions of a ChunkedMap cannot be tracked')
+
+    def track_observations(self, players):
+        raise ValueError('the observations of a ChunkedMap cannot be tracked')
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the allocated chunks.
+        """
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    def array(self):
+        """
+        Returns the whole inner array of the map, as a new array.
+
+        It allocates the whole board: use crop to read a part of it.
+        """
+        return self.crop((self.width // 2, self.height // 2), self.width + 2, self.height + 2)
+
+    def clone_array(self):
+        """
+        Returns a copy of the whole inner array of the map.
+        """
+        return self.array()
+
+    def to_tile_map(self):
+        """
+        Returns a TileMap with the tiles of the whole map.
+        """
+        mmap = TileMap(self.width, self.height)
+        np.copyto(mmap.array(), self.array())
+        return mmap
+
+    def apply(self, converter):
+        """
+        Converts a map by applying a function to each tile, building the
+        whole board.
+        """
+        return self.to_tile_map().apply(converter)
+
+    def crop(self, position, width, height = None):
+        """
+        Returns the codes of the tiles of the rectangle of width x height tiles
+        centered on position, laid out like the inner array, the tiles outside
+        of the map being walls.
+
+        Only the chunks covered by the rectangle are read.
+        """
+        if height is None:
+            height = width
+        c = self.chunk_size
+        i0 = position[0] + 1 - width // 2
+        j0 = position[1] + 1 - height // 2
+        codes = np.full((width, height), Tile.WALL.value, dtype=np.int8)
+
+        # The part of the rectangle inside the inner array
+        (a0, a1) = (max(i0, 0), min(i0 + width, self.width + 2))
+        (b0, b1) = (max(j0, 0), min(j0 + height, self.height + 2))
+        if a0 >= a1 or b0 >= b1:
+            return codes
+        for ci in range(a0 // c, (a1 - 1) // c + 1):
+            for cj in range(b0 // c, (b1 - 1) // c + 1):
+                chunk = self._read(ci, cj)
+                (x0, x1) = (max(a0, ci * c), min(a1, ci * c + c))
+                (y0, y1) = (max(b0, cj * c), min(b1, cj * c + c))
+                codes[x0 - i0:x1 - i0, y0 - j0:y1 - j0] = chunk[x0 - ci * c:x1 - ci * c, y0 - cj * c:y1 - cj * c]
+        return codes
+
+    def take(self, cells):
+        """
+        Returns the codes of the tiles of cells, indices in the flattened
+        inner array.
+        """
+        c = self.chunk_size
+        codes = np.empty(len(cells), dtype=np.int8)
+        for (k, (i, j)) in enumerate(zip(*np.divmod(cells, self.height + 2))):
+            codes[k] = self._read(i // c, j // c)[i % c, j % c]
+        return codes
+
+    def put(self, cells, codes):
+        """
+        Writes tile codes in cells, indices in the flattened inner array, in
+        order.
+        """
+        c = self.chunk_size
+        for ((i, j), code) in zip(zip(*np.divmod(cells, self.height + 2)), codes):
+            self._chunk(i // c, j // c)[i % c, j % c] = code
+
+    def state_for_player(self, p):
+        """
+        Returns an image representing the current perception of the
+        environment from player p, transposed like TileMap.state_for_player.
+
+        It allocates the whole board: use state_around for a part of it.
+        """
+        return self.perception_table(p)[self.array().T]
+
+    def __getitem__(self, index):
+        (i, j) = index
+        c = self.chunk_size
+        return Tile(self._read((i + 1) // c, (j + 1) // c)[(i + 1) % c, (j + 1) % c])
+
+    def __setitem__(self, position, other):
+        (i, j) = position
+        c = self.chunk_size
+        self._chunk((i + 1) // c, (j + 1) // c)[(i + 1) % c, (j + 1) % c] = other.value
@@ -0,0 +1,131 @@
+"""
+This module contains environments with the reset/step interface of the
+reinforcement learning libraries, on top of VecGame.
+"""
+
+import numpy as np
+
+from tron.vecgame import VecGame
+
+
+class VecTronEnv:
+    """
+    This class contains n environments of two-player games, stepped together.
+
+    The actions are the indices of the directions, from 0 to 3, which are the
+    values of the directions minus one, like the outputs of the networks. The
+    observations are the perceptions of both players, rewards are 1 for the
+    winner and -1 otherwise at the end of a game, and 0 during the game, as in
+    Game.trajectory.
+
+    Finished environments are reset automatically: the observations returned
+    for them are the first ones of the next game, and the last ones of the
+    finished game are returned in the infos.
+
+    All the arrays are allocated once: the observations, rewards and dones
+    returned are overwritten by the next call, so they must be copied to be
+    kept.
+    """
+
+    # The number of actions of each player
+    actions = 4
+
+    def __init__(self, n, width, height, seed = None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.game = VecGame(n, width, height, seed=seed, auto_reset=False)
+
+        self.observation_shape = (VecGame.players, height + 2, width + 2)
+        self._tables = [self.game._template.perception_table(p) for p in range(1, VecGame.players + 1)]
+        self._observations = np.empty((n,) + self.observation_shape, dtype=np.int8)
+        self._rewards = np.zeros((n, VecGame.players), dtype=np.float32)
+        self._ids = np.arange(1, VecGame.players + 1)
+
+    def observe(self):
+        """
+        Returns the current observations, as an array of shape
+        (n, 2, height + 2, width + 2).
+        """
+        board = self.game.board.transpose(0, 2, 1)
+        for (p, table) in enumerate(self._tables):
+            np.take(table, board, out=self._observations[:, p])
+        return self._observations
+
+    def reset(self):
+        """
+        Starts new games in all the environments, and returns their observations.
+        """
+        self.game.reset()
+        return self.observe()
+
+    def step(self, actions):
+        """
+        Plays the actions, an array of shape (n, 2), in all the environments.
+
+        Returns the observations, the rewards as an array of shape (n, 2), the
+        dones as an array of shape (n,), and a dictionary of infos, with the
+        winners of the games, 0 for a draw or a game that is not finished, and
+        the final observations and durations of the finished games.
+        """
+        (done, winner) = self.game.step(np.asarray(actions) + 1)
+
+        rewards = self._rewards
+        rewards.fill(0)
+        infos = {'winner': winner}
+        if done.any():
+            finished = np.flatnonzero(done)
+            rewards[finished] = np.where(winner[finished, None] == self._ids, 1, -1)
+            infos['final_observations'] = self.observe()[finished].copy()
+            infos['durations'] = self.game.durations[finished].copy()
+            self.game.reset(finished)
+
+        return (self.observe(), rewards, done, infos)
+
+
+class TronEnv:
+    """
+    This class is a single environment of a two-player game.
+
+    It has the same interface as VecTronEnv, without the first dimension of
+    the arrays, but it is not reset automatically: reset must be called when
+    the game is done.
+    """
+
+    actions = VecTronEnv.actions
+
+    def __init__(self, width, height, seed = None):
+        self.width = width
+        self.height = height
+        self._env = VecTronEnv(1, width, height, seed)
+        self.observation_shape = self._env.observation_shape
+        self.done = False
+
+    def reset(self, positions = None):
+        """
+        Starts a new game, from random start positions or from the positions
+        of the players, and returns its observations.
+        """
+        self._env.game.reset(positions=None if positions is None else np.asarray(positions)[None])
+        self.done = False
+        return self._env.observe()[0]
+
+    def step(self, actions):
+        """
+        Plays the actions of both players.
+
+        Returns the observations, the rewards of both players, whether the
+        game is done, and a dictionary of infos with its winner.
+        """
+        if self.done:
+            raise RuntimeError('the game is done, reset must be called')
+
+        (done, winner) = self._env.game.step(np.asarray(actions)[None] + 1)
+        self.done = bool(done[0])
+
+        rewards = self._env._rewards[0]
+        rewards.fill(0)
+        if self.done:
+            rewards[:] = np.where(winner[0] == self._env._ids, 1, -1)
+
+        return (self._env.observe()[0], rewards, self.done, {'winner': int(winner[0])})
@@ -2,14 +2,25 @@
 This module contains everything related to the game.
 """
 
-from time import sleep
+from collections import namedtuple
+from time import sleep, perf_counter
 from enum import Enum
 
-from tron.map import Map, Tile
+import numpy as np
+
+from tron.map import MAX_PLAYERS, TileMap, Tile
+from tron.chunked import ChunkedMap
+from tron.history import History, HistoryElement
 
 class Winner(Enum):
     PLAYER_ONE = 1
     PLAYER_TWO = 2
+    PLAYER_THREE = 3
+    PLAYER_FOUR = 4
+    PLAYER_FIVE = 5
+    PLAYER_SIX = 6
+    PLAYER_SEVEN = 7
+    PLAYER_EIGHT = 8
 
 class PositionPlayer:
     """
@@ -26,32 +37,30 @@ class PositionPlayer:
         """
         Returns the body type of the PP depending on its id.
         """
-        if self.id == 1:
-            return Tile.PLAYER_ONE_BODY
-        elif self.id == 2:
-            return Tile.PLAYER_TWO_BODY
+        return Tile.body(self.id)
 
     def head(self):
         """
         Returns the head type of the PP depending of its id.
         """
-        if self.id == 1:
-            return Tile.PLAYER_ONE_HEAD
-        elif self.id == 2:
-            return Tile.PLAYER_TWO_HEAD
+        return Tile.head(self.id)
 
 
-class HistoryElement:
-    """
-    An element from an history.
+GameTrajectory = namedtuple('GameTrajectory', ['observations', 'actions', 'rewards', 'dones'])
+GameTrajectory.__doc__ = """
+The arrays describing a finished game, T being the number of moves played.
 
-    It contains the map, but also the direction of each player during the frame.
-    The directions of the players will be None at the first frame.
-    """
-    def __init__(self, mmap, player_one_direction, player_two_direction):
-        self.map = mmap
-        self.player_one_direction = player_one_direction
-        self.player_two_direction = player_two_direction
+observations is an int8 array of shape (T, players, height + 2, width + 2)
+with the perception of each player at each step, as returned by
+Map.state_for_player. actions is an int8 array of shape (T, players) with the
+values of the directions minus one, rewards a float32 array of shape
+(T, players) which is 0 except at the last move of each player, where it is 1
+for the winner and -1 otherwise, and dones a boolean array of shape
+(T, players) which is True at the last move of each player.
+
+A player eliminated before the end of the game does not move anymore: its
+actions after its last move are -1.
+"""
 
 
 class Game:
@@ -59,29 +68,124 @@ class Game:
     This class contains the map of the game, and the players.
 
     It allows to update the player depending on their strategies, and run the game.
+    A game has from 1 to 8 players. The players that are eliminated stay on
+    the map, where they do not move anymore, and the last player alive wins.
     """
 
-    def __init__(self, width, height, pps):
+    def __init__(self, width, height, pps, profiler = None, regions = False, observations = False, chunk_size = None):
         """
         Returns a new game from its width, height, and number of players.
 
         Width and height are the number of blocs available in the tron map.
+        If a GameProfiler is passed as parameter, it records the timings of
+        the game. If regions is True, the map tracks its regions of empty
+        cells, and the maps given to the players have a RegionIndex.
+
+        If observations is True, the map keeps the perception of each player
+        up to date in place, and instead of a clone, the players are given a
+        read-only view of the map, so that no memory is allocated to them.
+
+        If chunk_size is given, the map is a ChunkedMap, whose chunks of
+        chunk_size x chunk_size tiles are only allocated when the players
+        reach them, for large arenas. The players are then given a read-only
+        view of the map too.
         """
+        if len(pps) > MAX_PLAYERS:
+            raise ValueError('a game has at most {} players'.format(MAX_PLAYERS))
+        if chunk_size is not None and (regions or observations):
+            raise ValueError('the regions and the observations of a chunked map cannot be tracked')
+
         self.width = width
         self.height = height
-        mmap = Map(width, height, Tile.EMPTY, Tile.WALL)
-        self.history = [HistoryElement(mmap, None, None)]
         self.pps = pps
         self.winner = None
+        self.profiler = profiler
+        if chunk_size is None:
+            self._map = TileMap(width, height)
+            self._claims = TileMap(width, height)
+        else:
+            self._map = ChunkedMap(width, height, chunk_size)
+            self._claims = ChunkedMap(width, height, chunk_size)
+        self._heads = np.array([pp.head().value for pp in pps], dtype=np.int8)
+        self._bodies = np.array([pp.body().value for pp in pps], dtype=np.int8)
+        # The players claim the squares they land on in the _claims map
+        self._order = np.arange(len(pps), dtype=np.int8)
 
         for pp in self.pps:
-            self.history[-1].map[pp.position[0], pp.position[1]] = pp.head()
+            self._map[pp.position[0], pp.position[1]] = pp.head()
+
+        if regions:
+            self._map.track_regions()
+        self._view = None
+        if observations:
+            self._map.track_observations(len(pps))
+        if observations or chunk_size is not None:
+            self._view = self._map.view()
+
+        self._cells = self._map_cells()
+        self.history = History(self._map, self.pps)
+
+    def reset(self, start_positions):
+        """
+        Starts a new game with the same players, from their start positions.
+
+        The map and the history of the game are reused instead of being
+        allocated again.
+        """
+        self.winner = None
+        self._map.clear()
+        for (pp, position) in zip(self.pps, start_positions):
+            pp.position = list(position)
+            pp.alive = True
+            self._map[pp.position[0], pp.position[1]] = pp.head()
+        self._cells = self._map_cells()
+        self.history.reset(self._map, self.pps)
 
     def map(self):
         """
         Returns a clone of the current map, the last map in the history.
         """
-        return self.history[-1].map.clone()
+        if self.profiler is None:
+            return self._map.clone()
+
+        start = perf_counter()
+        clone = self._map.clone()
+        self.profiler.clone(clone, perf_counter() - start)
+        return clone
+
+    def player_map(self):
+        """
+        Returns the map given to the players: a clone of the current map, or
+        a read-only view of it if the game keeps the observations.
+        """
+        if self._view is not None:
+            return self._view
+        return self.map()
+
+    def trajectory(self):
+        """
+        Returns the GameTrajectory of a finished game.
+
+        The observations are the whole map at every step, which is what a
+        ChunkedMap avoids building: a ValueError is raised for the games
+        played on one.
+        """
+        actions = self.history.moves() - 1
+        moves = len(actions)
+
+        codes = self.history.codes()[:moves].transpose(0, 2, 1)
+        observations = np.stack([self._map.perception_table(p)[codes] for p in range(1, len(self.pps) + 1)], axis=1)
+
+        rewards = np.zeros((moves, len(self.pps)), dtype=np.float32)
+        dones = np.zeros((moves, len(self.pps)), dtype=np.bool_)
+
+        # The players stop moving once they are eliminated
+        last = (actions >= 0).sum(axis=0) - 1
+        players = np.flatnonzero(last >= 0)
+        rewards[last[players], players] = [1 if self.winner == self.pps[p].id else -1 for p in players]
+        dones[last[players], players] = True
+
+        return GameTrajectory(observations, actions, rewards, dones)
 
     def next_frame(self, window = None):
         """
@@ -89,77 +193,122 @@ class Game:
 
         If a window is passed as parameter, events are polled and passed to the
         players, so you can play the game.
-        Then, all the players are updated and if a player lands on a square
-        that is already occupied or that is outside of the map, the players
-        dies.
+        Then, all the players that are alive are updated and if a player lands
+        on a square that is already occupied or that is outside of the map, or
+        on the same square as another player, the player dies. The collisions
+        of all the players are resolved at once, with array operations on
+        their positions.
 
         If there is an error during the evaluation of a player strategy, the
-        player will automatically lose and this function will return False.
+        player is eliminated, and if it ends the game, the last player alive
+        wins and this function returns False.
         """
 
-        map_clone = self.map()
-
-        # Set previous heads to body
-        for pp in self.pps:
-            map_clone[pp.position[0], pp.position[1]] = pp.body()
+        profiler = self.profiler
+        previous_positions = [pp.position for pp in self.pps]
+        directions = [None] * len(self.pps)
 
         # Play next move
         for id, pp in enumerate(self.pps):
+            if not pp.alive:
+                continue
             try:
-                (pp.position, pp.player.direction) = pp.player.next_position_and_direction(pp.position, id + 1, self.map())
+                mmap = self.player_map()
+                if profiler is not None:
+                    start = perf_counter()
+                (pp.position, pp.player.direction) = pp.player.next_position_and_direction(pp.position, id + 1, mmap)
+                directions[id] = pp.player.direction
+                if profiler is not None:
+                    profiler.decision(id + 1, perf_counter() - start)
             except:
                 # An error occured during the evaluation of pp.player strategy
-                if id == 0:
-                    self.winner = 2
-                elif id == 1:
-                    self.winner = 1
-                return False
-
+                directions[id] = None
+                if self._forfeit(pp, previous_positions[id]):
+                    return False
 
-        # Update history with newly played move
-        self.history[-1].player_one_direction = self.pps[0].player.direction
-        self.history[-1].player_two_direction = self.pps[1].player.direction
+        if profiler is not None:
+            start = perf_counter()
 
         # Manage the events
         if window:
-            import pygame
-            while True:
-                event = pygame.event.poll()
-
-                if event.type == pygame.NOEVENT:
-                    break
-
-                for pp in self.pps:
+            for event in window.events():
+                for id, pp in enumerate(self.pps):
+                    if not pp.alive:
+                        continue
                     try:
                         pp.player.manage_event(event)
                     except:
                         # An error occured during the evaluation of pp.player strategy
-                        if id == 0:
-                            self.winner = 2
-                        elif id == 1:
-                            self.winner = 1
-                        return False
+                        directions[id] = None
+                        if self._forfeit(pp, previous_positions[id]):
+                            return False
+
+        if profiler is not None:
+            profiler.phase('events', perf_counter() - start)
+            start = perf_counter()
+
+        previous = self._cells
+        self._cells = self._map_cells()
+
+        # Set previous heads to body, the players that do not move anymore
+        # getting their head back below
+        self._map.put(previous, self._bodies)
+
+        # A player dies if it lands on a square that is not empty, walls being
+        # on the borders of the map, or on the same square as another player,
+        # in which case the first and the last players claiming the square are
+        # different: dead is non-zero in both cases
+        landed = self._map.take(self._cells)
+        self._claims.put(self._cells, self._order)
+        last = self._claims.take(self._cells)
+        self._claims.put(self._cells[::-1], self._order[::-1])
+        first = self._claims.take(self._cells)
+        dead = np.bitwise_or(landed, first ^ last).tolist()
+
+        # The players that do not move anymore are on their own body
+        for (pp, d) in zip(self.pps, dead):
+            if d:
+                pp.alive = False
 
-        for (id, pp) in enumerate(self.pps):
+        self._map.put(self._cells, self._heads)
 
-            # Check boundaries
-            if pp.position[0] < 0 or pp.position[1] < 0 or \
-               pp.position[0] >= self.width or pp.position[1] >= self.height:
+        if profiler is not None:
+            profiler.phase('collisions', perf_counter() - start)
+            start = perf_counter()
 
-                pp.alive = False
-                map_clone[pp.position[0], pp.position[1]] = pp.head()
+        # Append to history, with the newly played moves
+        self.history.append(
+            directions,
+            [pp.position for pp in self.pps],
+            self._map)
 
-            # Check collision
-            elif map_clone[pp.position[0], pp.position[1]] is not Tile.EMPTY:
-                pp.alive = False
-                map_clone[pp.position[0], pp.position[1]] = pp.head()
+        if profiler is not None:
+            profiler.phase('history', perf_counter() - start)
+            profiler.frame()
 
-            else:
-                map_clone[pp.position[0], pp.position[1]] = pp.head()
+        return True
 
-        # Append to history
-        self.history.append(HistoryElement(map_clone, None, None))
+    def _map_cells(self):
+        """
+        Returns the indices of the heads of the players in the flattened
+        array of the map.
+        """
+        stride = self.height + 2
+        return np.array([(pp.position[0] + 1) * stride + pp.position[1] + 1 for pp in self.pps])
 
+    def _forfeit(self, pp, position):
+        """
+        Eliminates a player whose strategy failed, which stays at position.
+
+        Returns True if it ends the game, the winner being the last player
+        alive if there is one.
+        """
+        pp.alive = False
+        pp.position = position
+        alive = [other.id for other in self.pps if other.alive]
+        if len(alive) > 1:
+            return False
+        self.winner = alive[0] if alive else None
         return True
 
     def main_loop(self, window = None):
@@ -173,32 +322,67 @@ class Game:
             window.render_map(self.map())
 
         while True:
-            alive_count = 0
-            alive = None
-
             if window:
                 sleep(0.1)
 
             if not self.next_frame(window):
                 break
 
-            for pp in self.pps:
-                if pp.alive:
-                    alive_count += 1
-                    alive = pp.id
-
-            if alive_count <= 1:
-                if alive_count == 1:
-                   # If player one and two share the same position, it will
-                   # mean that they reached the same tile at the same
-                   # moment, so it's really a draw.
-                    if self.pps[0].position[0] != self.pps[1].position[0] or \
-                       self.pps[0].position[1] != self.pps[1].position[1]:
-
-                       # Otherwise, the winner is the player that is still alive.
-                       self.winner = alive
+            alive = [pp.id for pp in self.pps if pp.alive]
+
+            # A game with a single player goes on until it dies
+            if len(alive) == 0 or (len(alive) == 1 and len(self.pps) > 1):
+                # The winner is the player that is still alive. If the last
+                # players died during the same frame, reaching the same tile at
+                # the same moment for instance, it's really a draw.
+                self.winner = alive[0] if alive else None
                 break
 
             if window:
                 window.render_map(self.map())
 
+        if self.profiler is not None:
+            self.profiler.end_game(self)
+
+
+class GamePool:
+    """
+    This class keeps the games that are finished, to play new games with them
+    instead of creating new games, their players and their maps.
+
+    The players are created by factories, one per player, that are called
+    only when a new game is needed. Since the players are reused from a game
+    to the next, they must not keep any state from a game that would matter
+    in the next one.
+    """
+    def __init__(self, width, height, factories, **options):
+        """
+        Creates a pool of games of a size, with the players of factories.
+
+        The options are passed to the constructor of the games.
+        """
+        self.width = width
+        self.height = height
+        self.factories = factories
+        self.options = options
+        self._games = []
+
+    def acquire(self, start_positions):
+        """
+        Returns a game ready to be played from the start positions of its players.
+        """
+        if self._games:
+            game = self._games.pop()
+            game.reset(start_positions)
+            return game
+
+        return Game(self.width, self.height, [
+            PositionPlayer(id + 1, factory(), list(position))
+            for (id, (factory, position)) in enumerate(zip(self.factories, start_positions))
+        ], **self.options)
+
+    def release(self, game):
+        """
+        Gives back a game that is not used anymore.
+        """
+        self._games.append(game)
@@ -0,0 +1,216 @@
+"""
+This module contains the history of a game.
+"""
+
+from array import array
+
+import numpy as np
+
+from tron.chunked import ChunkedMap
+from tron.player import Direction
+
+
+class HistoryElement:
+    """
+    An element from an history.
+
+    It contains the map, but also the direction of each player during the frame,
+    in the directions list. The directions of the players will be None at the
+    first frame, and for the players that were eliminated.
+    player_one_direction and player_two_direction are the directions of the
+    first two players.
+    """
+    def __init__(self, mmap, *directions):
+        self.map = mmap
+        self.directions = list(directions)
+        self.player_one_direction = directions[0] if len(directions) > 0 else None
+        self.player_two_direction = directions[1] if len(directions) > 1 else None
+
+
+class LazyHistoryElement(HistoryElement):
+    """
+    An element from a History, whose map is only rebuilt when it is accessed.
+    """
+    def __init__(self, history, step, directions):
+        self._history = history
+        self._step = step
+        self._map = None
+        self.directions = directions
+        self.player_one_direction = directions[0] if len(directions) > 0 else None
+        self.player_two_direction = directions[1] if len(directions) > 1 else None
+
+    @property
+    def map(self):
+        if self._map is None:
+            self._map = self._history.map(self._step)
+        return self._map
+
+
+class History:
+    """
+    The history of a game.
+
+    Instead of a map per frame, it stores the start map, and for each frame the
+    positions of the heads of the players and their directions. The map of a
+    step is rebuilt by replaying the frames, starting from the closest of the
+    keyframes that are stored every keyframe_interval frames.
+
+    It can be used as a list of HistoryElement.
+    """
+    def __init__(self, mmap, pps, keyframe_interval = 32):
+        """
+        Creates a new history from the start map and the players of the game.
+        """
+        self.keyframe_interval = keyframe_interval
+        self._keyframes = []
+        self._spare = []
+        self.reset(mmap, pps)
+
+    def reset(self, mmap, pps):
+        """
+        Starts a new history from the start map and the players of a game.
+
+        The maps of the keyframes of the previous history are reused, the
+        elements returned before must not be used anymore.
+        """
+        self._players = len(pps)
+        self._heads = [pp.head() for pp in pps]
+        self._bodies = [pp.body() for pp in pps]
+        self._spare.extend(self._keyframes)
+        self._keyframes = [self._snapshot(mmap)]
+        self._positions = array('h')
+        self._directions = array('b')
+        for pp in pps:
+            self._positions.extend(pp.position[:2])
+
+    def _snapshot(self, mmap):
+        """
+        Returns a copy of a map, reusing a spare keyframe if possible.
+        """
+        while self._spare:
+            keyframe = self._spare.pop()
+            if hasattr(keyframe, 'copy_from') and type(keyframe) is type(mmap) and \
+               (keyframe.width, keyframe.height) == (mmap.width, mmap.height):
+                keyframe.copy_from(mmap)
+                return keyframe
+        return mmap.clone()
+
+    def __len__(self):
+        return len(self._positions) // (2 * self._players)
+
+    def append(self, directions, positions, mmap):
+        """
+        Records a new frame.
+
+        directions are the directions taken by the players during the frame,
+        positions their new positions, and mmap the map at the end of the
+        frame, which is cloned if a keyframe is needed.
+        """
+        self._directions.extend(0 if d is None else d.value for d in directions)
+        for position in positions:
+            self._positions.extend(position[:2])
+        if (len(self) - 1) % self.keyframe_interval == 0:
+            self._keyframes.append(self._snapshot(mmap))
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the frames and the keyframes.
+        """
+        return self._positions.itemsize * len(self._positions) + \
+            self._directions.itemsize * len(self._directions) + \
+            sum(keyframe.nbytes() for keyframe in self._keyframes)
+
+    def positions(self, step):
+        """
+        Returns the positions of the heads of the players at a step.
+        """
+        start = 2 * self._players * step
+        data = self._positions[start:start + 2 * self._players]
+        return [(data[2 * i], data[2 * i + 1]) for i in range(self._players)]
+
+    def directions(self, step):
+        """
+        Returns the directions taken by the players at a step, which are None
+        for the last step.
+        """
+        if step >= len(self._directions) // self._players:
+            return [None] * self._players
+        start = self._players * step
+        return [Direction(d) if d else None for d in self._directions[start:start + self._players]]
+
+    def moves(self):
+        """
+        Returns the values of the directions taken by the players at each
+        step but the last one, as an int8 array of shape (len(self) - 1, players).
+        """
+        return np.frombuffer(self._directions, dtype=np.int8).reshape(-1, self._players)
+
+    def codes(self):
+        """
+        Returns the tile codes of the maps of all the steps, as an array of
+        shape (len(self), width + 2, height + 2).
+
+        For each cell and each step, the code is the one of the last tile
+        written on the cell up to that step, which is found for all of them at
+        once by accumulating the indices of the writes over the steps.
+
+        The array holds the whole board at every step, so it is not built for
+        the games played on a ChunkedMap, which raise a ValueError.
+        """
+        if isinstance(self._keyframes[0], ChunkedMap):
+            raise ValueError('the codes of every step of a ChunkedMap game are not built')
+        start = self._keyframes[0].array()
+        length = len(self)
+        stride = start.shape[1]
+
+        positions = np.frombuffer(self._positions, dtype=np.int16).reshape(length, self._players, 2) + 1
+        cells = positions[..., 0].astype(np.intp) * stride + positions[..., 1]
+
+        # At each frame, the previous heads are set to body, then the new heads
+        # are written, in the order of the players
+        written_cells = np.concatenate([cells[:-1], cells[1:]], axis=1)
+        written_codes = np.array([t.value for t in self._bodies + self._heads], dtype=np.int8)
+        writes = np.arange(1, written_cells.size + 1).reshape(written_cells.shape)
+
+        last = np.zeros((length, start.size), dtype=np.intp)
+        np.maximum.at(last, (np.arange(1, length)[:, None], written_cells), writes)
+        np.maximum.accumulate(last, axis=0, out=last)
+
+        codes = np.tile(written_codes, length)[last - 1]
+        codes = np.where(last > 0, codes, start.reshape(1, -1))
+        return codes.reshape((length,) + start.shape)
+
+    def map(self, step):
+        """
+        Rebuilds the map at a step.
+        """
+        step = self._index(step)
+        keyframe = step // self.keyframe_interval
+        mmap = self._keyframes[keyframe].clone()
+        previous = self.positions(keyframe * self.keyframe_interval)
+        for frame in range(keyframe * self.keyframe_interval + 1, step + 1):
+            current = self.positions(frame)
+            for (position, body) in zip(previous, self._bodies):
+                mmap[position] = body
+            for (position, head) in zip(current, self._heads):
+                mmap[position] = head
+            previous = current
+        return mmap
+
+    def _index(self, step):
+        length = len(self)
+        if step < 0:
+            step += length
+        if step < 0 or step >= length:
+            raise IndexError('history index out of range')
+        return step
+
+    def __getitem__(self, step):
+        if isinstance(step, slice):
+            return [self[i] for i in range(*step.indices(len(self)))]
+        step = self._index(step)
+        return LazyHistoryElement(self, step, self.directions(step))
+
+    def __iter__(self):
+        for step in range(len(self)):
+            yield self[step]
@@ -8,9 +8,33 @@ from enum import Enum
 def is_on_border(i, j, w ,h):
     return i == 0 or i == w - 1 or j == 0 or j == h - 1
 
+
+# The arrays of the empty maps, by size and values of the tiles
+_templates = {}
+
+def template(w, h, empty, wall, dtype = None):
+    """
+    Returns the array of an empty map of width w and height h, with `empty`
+    in the inside and `wall` on the borders.
+
+    It is built once for each size and values, and must not be modified.
+    """
+    key = (w, h, empty, wall, type(empty), type(wall), dtype)
+    data = _templates.get(key)
+    if data is None:
+        if dtype is None:
+            dtype = np.array([empty, wall]).dtype
+        data = np.full((w + 2, h + 2), wall, dtype=dtype)
+        data[1:-1, 1:-1] = empty
+        data.flags.writeable = False
+        _templates[key] = data
+    return data
+
 class Tile(Enum):
     """
     The different type of elements that can be in a map.
+
+    The body of player k is 2k - 1 and its head 2k, for up to 8 players.
     """
     EMPTY = 0
     WALL = -1
@@ -18,6 +42,18 @@ class Tile(Enum):
     PLAYER_ONE_HEAD = 2
     PLAYER_TWO_BODY = 3
     PLAYER_TWO_HEAD = 4
+    PLAYER_THREE_BODY = 5
+    PLAYER_THREE_HEAD = 6
+    PLAYER_FOUR_BODY = 7
+    PLAYER_FOUR_HEAD = 8
+    PLAYER_FIVE_BODY = 9
+    PLAYER_FIVE_HEAD = 10
+    PLAYER_SIX_BODY = 11
+    PLAYER_SIX_HEAD = 12
+    PLAYER_SEVEN_BODY = 13
+    PLAYER_SEVEN_HEAD = 14
+    PLAYER_EIGHT_BODY = 15
+    PLAYER_EIGHT_HEAD = 16
 
     def color(self):
         """
@@ -27,16 +63,37 @@ class Tile(Enum):
             return (255, 255, 255)
         elif self == Tile.WALL:
             return (0, 0, 0)
-        elif self == Tile.PLAYER_ONE_BODY:
-            return (128, 0, 0)
-        elif self == Tile.PLAYER_ONE_HEAD:
-            return (255, 0, 0)
-        elif self == Tile.PLAYER_TWO_BODY:
-            return (0, 128, 0)
-        elif self == Tile.PLAYER_TWO_HEAD:
-            return (0, 255, 0)
-        else:
-            return None
+        (head, body) = PLAYER_COLORS[(self.value - 1) // 2]
+        return body if self.value % 2 else head
+
+    @staticmethod
+    def body(id):
+        """
+        Returns the body of the player with this id.
+        """
+        return Tile(2 * id - 1)
+
+    @staticmethod
+    def head(id):
+        """
+        Returns the head of the player with this id.
+        """
+        return Tile(2 * id)
+
+# The colors of the head and of the body of each player
+PLAYER_COLORS = [
+    ((255, 0, 0), (128, 0, 0)),
+    ((0, 255, 0), (0, 128, 0)),
+    ((0, 0, 255), (0, 0, 128)),
+    ((255, 255, 0), (128, 128, 0)),
+    ((255, 0, 255), (128, 0, 128)),
+    ((0, 255, 255), (0, 128, 128)),
+    ((255, 128, 0), (128, 64, 0)),
+    ((128, 0, 255), (64, 0, 128)),
+]
+
+MAX_PLAYERS = len(PLAYER_COLORS)
+
 
 class Map:
     """
@@ -55,13 +112,15 @@ class Map:
         """
         self.width = w
         self.height = h
-        self._data = np.array([[wall if is_on_border(i, j, w + 2, h + 2) else empty for i in range(h + 2)] for j in range(w + 2)])
+        self._data = template(w, h, empty, wall).copy()
 
     def clone(self):
         """
         Creates a clone of the map.
         """
-        clone = Map(self.width, self.height, 0, 0)
+        clone = Map.__new__(Map)
+        clone.width = self.width
+        clone.height = self.height
         clone._data = np.copy(self._data)
         return clone
 
@@ -69,8 +128,13 @@ class Map:
         """
         Converts a map by applying a function to each element.
         """
-        converted = Map(self.width, self.height, 0, 0)
-        converted._data = np.array([[converter(self._data[i][j]) for i in range(self.height + 2)] for j in range(self.width + 2)])
+        converted = Map.__new__(Map)
+        converted.width = self.width
+        converted.height = self.height
+        converted._data = np.array([
+            [converter(self._data[i][j]) for i in range(self.height + 2)]
+            for j in range(self.width + 2)
+        ])
         return converted
 
     def array(self):
@@ -79,6 +143,12 @@ class Map:
         """
         return self._data
 
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the tiles of the map.
+        """
+        return self._data.nbytes
+
     def clone_array(self):
         """
         Returns a copy of the inner array of the map.
@@ -95,16 +165,13 @@ class Map:
             return 1
         elif t == Tile.WALL:
             return -1
-        elif t == Tile.PLAYER_ONE_BODY:
-            return -1
-        elif t == Tile.PLAYER_ONE_HEAD:
-            return 10 if p == 1 else -10
-        elif t == Tile.PLAYER_TWO_BODY:
+        elif not isinstance(t, Tile):
+            return None
+        elif t.value % 2 == 1:
+            # The body of any player
             return -1
-        elif t == Tile.PLAYER_TWO_HEAD:
-            return 10 if p == 2 else -10
         else:
-            return None
+            return 10 if t.value == 2 * p else -10
 
     def state_for_player(self, p):
         """
@@ -120,3 +187,198 @@ class Map:
         (i, j) = position
         self._data[i+1][j+1] = other
 
+
+class TileMap(Map):
+    """
+    A map of tiles stored as a compact array of tile codes.
+
+    The inner array contains the values of the tiles as int8, so that it can
+    be copied and converted with NumPy operations, but the [] operator still
+    reads and writes Tile elements.
+    """
+    def __init__(self, w, h):
+        """
+        Creates a new tile map from its width and its height.
+
+        The inside is filled with Tile.EMPTY and the borders with Tile.WALL.
+        """
+        self.width = w
+        self.height = h
+        self._data = template(w, h, Tile.EMPTY.value, Tile.WALL.value, np.int8).copy()
+        self.regions = None
+        self.observations = None
+
+    def clear(self):
+        """
+        Empties the map in place, without allocating a new array.
+
+        The regions and the observations, if they are tracked, are computed
+        again in place, so that the views of the map see them.
+        """
+        empty = template(self.width, self.height, Tile.EMPTY.value, Tile.WALL.value, np.int8)
+        np.copyto(self._data, empty)
+        if self.regions is not None:
+            self.regions.reset(self)
+        if self.observations is not None:
+            self.observations.refresh(self)
+
+    def copy_from(self, other):
+        """
+        Copies the tiles of another TileMap of the same size into this one,
+        without allocating a new array.
+        """
+        np.copyto(self._data, other._data)
+        self.regions = None if other.regions is None else other.regions.clone()
+        self.observations = None if other.observations is None else other.observations.clone()
+
+    def clone(self):
+        """
+        Creates a clone of the map.
+        """
+        clone = TileMap.__new__(TileMap)
+        clone.width = self.width
+        clone.height = self.height
+        clone._data = self._data.copy()
+        clone.regions = None if self.regions is None else self.regions.clone()
+        clone.observations = None if self.observations is None else self.observations.clone()
+        return clone
+
+    def view(self):
+        """
+        Returns a read-only map sharing the tiles, the regions and the
+        observations of this one, which changes with it.
+        """
+        view = TileMap.__new__(TileMap)
+        view.width = self.width
+        view.height = self.height
+        view._data = self._data.view()
+        view._data.flags.writeable = False
+        view.regions = self.regions
+        view.observations = self.observations
+        return view
+
+    def apply(self, converter):
+        """
+        Converts a map by applying a function to each tile.
+        """
+        return Map.apply(self, lambda code: converter(Tile(code)))
+
+    def track_regions(self):
+        """
+        Attaches a RegionIndex to the map, which is then updated each time a
+        tile changes and copied with the map, and returns it.
+        """
+        from tron.regions import RegionIndex
+        self.regions = RegionIndex(self)
+        return self.regions
+
+    def track_observations(self, players):
+        """
+        Attaches an Observations to the map, which keeps the perception of the
+        players up to date in float32 buffers, and returns it.
+
+        The live buffer of player p is read with observations.array(p), while
+        state_for_player still returns a copy.
+        """
+        from tron.observations import Observations
+        self.observations = Observations(self, players)
+        return self.observations
+
+    def perception_table(self, p):
+        """
+        Returns the lookup table converting tile codes into the perception of
+        player p.
+
+        The table is indexed directly by the codes: since Tile.WALL is -1, it
+        is stored in the last cell of the table.
+        """
+        table = _perception_tables.get(p)
+        if table is None:
+            table = np.zeros(max(t.value for t in Tile) + 2, dtype=np.int8)
+            for tile in Tile:
+                table[tile.value] = self.color(tile, p)
+            _perception_tables[p] = table
+        return table
+
+    def state_for_player(self, p):
+        """
+        Returns an image representing the current perception of the environment from player p.
+
+        Like Map.apply, the image is transposed with respect to the inner array.
+        """
+        return self.perception_table(p)[self._data.T]
+
+    def __getitem__(self, index):
+        (i, j) = index
+        return Tile(self._data[i + 1, j + 1])
+
+    def __setitem__(self, position, other):
+        (i, j) = position
+        old = self._data[i + 1, j + 1]
+        self._data[i + 1, j + 1] = other.value
+        if self.regions is not None:
+            self.regions.update(position, old, other.value)
+        if self.observations is not None:
+            self.observations.update(position, other.value)
+
+    def crop(self, position, width, height = None):
+        """
+        Returns the codes of the tiles of the rectangle of width x height tiles
+        centered on position, laid out like the inner array, the tiles outside
+        of the map being walls.
+        """
+        if height is None:
+            height = width
+        i0 = position[0] + 1 - width // 2
+        j0 = position[1] + 1 - height // 2
+        codes = np.full((width, height), Tile.WALL.value, dtype=np.int8)
+        (a0, a1) = (max(i0, 0), min(i0 + width, self.width + 2))
+        (b0, b1) = (max(j0, 0), min(j0 + height, self.height + 2))
+        if a0 < a1 and b0 < b1:
+            codes[a0 - i0:a1 - i0, b0 - j0:b1 - j0] = self._data[a0:a1, b0:b1]
+        return codes
+
+    def state_around(self, p, position, size):
+        """
+        Returns the perception of player p of the square of size x size tiles
+        centered on position, transposed like state_for_player. Its cost does
+        not depend on the size of the map.
+        """
+        return self.perception_table(p)[self.crop(position, size).T]
+
+    def observation(self, p, position, size):
+        """
+        Returns the perception of player p as a size x size image: the whole
+        map if it has this size, as returned by state_for_player, or else the
+        square centered on position, the head of the player.
+        """
+        if self.width + 2 == size and self.height + 2 == size:
+            return self.state_for_player(p)
+        return self.state_around(p, position, size)
+
+    def take(self, cells):
+        """
+        Returns the codes of the tiles of cells, the indices of the tiles in
+        the flattened inner array.
+        """
+        return self._data.reshape(-1)[cells]
+
+    def put(self, cells, codes):
+        """
+        Writes tile codes in cells, the indices of the tiles in the flattened
+        inner array, in order, so that the last code wins when a cell is
+        repeated.
+
+        The codes are written with a single NumPy assignment, unless the map
+        tracks its regions or observations, which are updated tile by tile.
+        """
+        if self.regions is None and self.observations is None:
+            self._data.reshape(-1)[cells] = codes
+            return
+        for (cell, code) in zip(cells, codes):
+            (i, j) = divmod(int(cell), self.height + 2)
+            self[i - 1, j - 1] = Tile(int(code))
+
+
+_perception_tables = {}
+
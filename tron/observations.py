@@ -0,0 +1,78 @@
+"""
+This module contains the Observations class, that keeps the perception of
+each player of a map up to date.
+"""
+
+import numpy as np
+
+
+class Observations:
+    """
+    This class keeps a buffer per player with its perception of a map, as
+    returned by Map.state_for_player but as float32, so that it can be passed
+    to a network without any conversion.
+
+    The buffers are patched each time a tile of the map changes, instead of
+    being computed again from the whole map. They are stored in a single
+    array of shape (players, 1, height + 2, width + 2), so that the buffer of
+    a player is already shaped as a batch of one image with one channel.
+    """
+    def __init__(self, mmap, players):
+        """
+        Creates the buffers of the players of a TileMap.
+        """
+        # The perception of each player of each tile code, indexed by code
+        self.tables = np.stack([mmap.perception_table(p) for p in range(1, players + 1)], axis=1).astype(np.float32)
+        self.buffers = np.empty((players, 1, mmap.height + 2, mmap.width + 2), dtype=np.float32)
+        self.refresh(mmap)
+        self._tensors = {}
+
+    def refresh(self, mmap):
+        """
+        Computes the buffers again from the whole map, in place.
+        """
+        self.buffers[:, 0] = self.tables[mmap.array().T].transpose(2, 0, 1)
+
+    def clone(self):
+        """
+        Creates a copy of the buffers.
+        """
+        clone = Observations.__new__(Observations)
+        clone.tables = self.tables
+        clone.buffers = self.buffers.copy()
+        clone._tensors = {}
+        return clone
+
+    def players(self):
+        """
+        Returns the number of players whose perception is kept.
+        """
+        return len(self.buffers)
+
+    def update(self, position, code):
+        """
+        Updates the buffers when the tile at position changes to code.
+        """
+        (i, j) = position
+        self.buffers[:, 0, j + 1, i + 1] = self.tables[code]
+
+    def array(self, p):
+        """
+        Returns the buffer of player p, as an array of shape
+        (height + 2, width + 2).
+
+        It is not a copy: it changes with the map.
+        """
+        return self.buffers[p - 1, 0]
+
+    def tensor(self, p):
+        """
+        Returns the buffer of player p as a torch tensor of shape
+        (1, 1, height + 2, width + 2), sharing its memory.
+        """
+        tensor = self._tensors.get(p)
+        if tensor is None:
+            import torch
+            tensor = torch.from_numpy(self.buffers[p - 1:p])
+            self._tensors[p] = tensor
+        return tensor
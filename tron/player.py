@@ -23,7 +23,8 @@ class Player(object):
     class that derives this one.
     """
     def __init__(self):
-        pass
+        # The position of the head of the player during its last decision
+        self.position = None
 
     def find_file(self, name):
         """
@@ -52,7 +53,11 @@ class Player(object):
         """
         Computes the direction of the player, and computes its next position
         depending on the current position.
+
+        The current position is kept in self.position while action is called,
+        for the players that need to know where their head is.
         """
+        self.position = current_position
         direction = self.action(map, id)
         return (self.next_position(current_position, direction), direction)
 
@@ -84,6 +89,35 @@ class Mode(Enum):
     ZQSD = 2
 
 
+_keyboard_constants = None
+
+def _keyboard():
+    """
+    Returns the type of the key down events, and the key codes of the
+    directions for each mode.
+
+    pygame is only imported the first time, when keyboard events arrive.
+    """
+    global _keyboard_constants
+    if _keyboard_constants is None:
+        import pygame
+        _keyboard_constants = (pygame.KEYDOWN, {
+            Mode.ARROWS: {
+                Direction.LEFT: pygame.K_LEFT,
+                Direction.UP: pygame.K_UP,
+                Direction.RIGHT: pygame.K_RIGHT,
+                Direction.DOWN: pygame.K_DOWN,
+            },
+            Mode.ZQSD: {
+                Direction.LEFT: pygame.K_q,
+                Direction.UP: pygame.K_z,
+                Direction.RIGHT: pygame.K_d,
+                Direction.DOWN: pygame.K_s,
+            },
+        })
+    return _keyboard_constants
+
+
 class KeyboardPlayer(Player):
     """"
     This is the key board interaction.
@@ -98,48 +132,46 @@ class KeyboardPlayer(Player):
         self.direction = initial_direction
         self.mode = mode
 
+    def keys(self):
+        """
+        Returns the key codes of the directions of the player depending on
+        the mode, as a dictionary.
+        """
+        return _keyboard()[1][self.mode]
+
     def left(self):
         """
         Returns the left key of the player depending on the mode.
         """
-        import pygame
-        return pygame.K_q if self.mode == Mode.ZQSD else pygame.K_LEFT
+        return self.keys()[Direction.LEFT]
 
     def right(self):
         """
         Returns the right key of the player depending on the mode.
         """
-        import pygame
-        return pygame.K_d if self.mode == Mode.ZQSD else pygame.K_RIGHT
+        return self.keys()[Direction.RIGHT]
 
     def down(self):
         """
         Returns the down key of the player depending on the mode.
         """
-        import pygame
-        return pygame.K_s if self.mode == Mode.ZQSD else pygame.K_DOWN
+        return self.keys()[Direction.DOWN]
 
     def up(self):
         """
         Returns the up key of the player depending on the mode.
         """
-        import pygame
-        return pygame.K_z if self.mode == Mode.ZQSD else pygame.K_UP
+        return self.keys()[Direction.UP]
 
     def manage_event(self, event):
         """
         Changes the direction of the tron depending on the keyboard inputs.
         """
-        import pygame
-        if event.type == pygame.KEYDOWN:
-            if event.key == self.left():
-                self.direction = Direction.LEFT
-            if event.key == self.up():
-                self.direction = Direction.UP
-            if event.key == self.right():
-                self.direction = Direction.RIGHT
-            if event.key == self.down():
-                self.direction = Direction.DOWN
+        (keydown, keys) = _keyboard()
+        if event.type == keydown:
+            for (direction, key) in keys[self.mode].items():
+                if event.key == key:
+                    self.direction = direction
 
     def action(self, map, id):
         """
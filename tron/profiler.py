@@ -0,0 +1,99 @@
+"""
+This module contains the GameProfiler class, that records where the time of
+the games goes.
+"""
+
+from collections import defaultdict
+import json
+
+class GameProfiler:
+    """
+    This class accumulates timings and counters of the games it is passed to.
+
+    It records the time spent in each phase of Game.next_frame, the latency of
+    the decisions of each player as a histogram, and the number and size of
+    the maps cloned. A single profiler can be shared by a batch of games, and
+    its statistics exported at the end as a flat dictionary.
+    """
+    # Upper bounds of the buckets of the latency histograms, in microseconds
+    buckets = [2 ** k for k in range(25)]
+
+    def __init__(self):
+        self.games = 0
+        self.frames = 0
+        self.phases = defaultdict(float)
+        self.decisions = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self.decision_time = defaultdict(float)
+        self.clones = 0
+        self.clone_bytes = 0
+        self.clone_time = 0.0
+        self.history_bytes = 0
+
+    def phase(self, name, seconds):
+        """
+        Records the time spent in a phase of a frame.
+        """
+        self.phases[name] += seconds
+
+    def decision(self, player, seconds):
+        """
+        Records the time taken by a player to decide its next move.
+        """
+        microseconds = seconds * 1e6
+        histogram = self.decisions[player]
+        bucket = 0
+        while bucket < len(self.buckets) and microseconds > self.buckets[bucket]:
+            bucket += 1
+        histogram[bucket] += 1
+        self.decision_time[player] += seconds
+
+    def clone(self, mmap, seconds):
+        """
+        Records a clone of a map.
+        """
+        self.clones += 1
+        self.clone_bytes += mmap.nbytes()
+        self.clone_time += seconds
+
+    def frame(self):
+        """
+        Records the end of a frame.
+        """
+        self.frames += 1
+
+    def end_game(self, game):
+        """
+        Records the end of a game.
+        """
+        self.games += 1
+        self.history_bytes += game.history.nbytes()
+
+    def stats(self):
+        """
+        Returns the statistics as a flat dictionary.
+        """
+        stats = {
+            'games': self.games,
+            'frames': self.frames,
+            'clones': self.clones,
+            'clones.bytes': self.clone_bytes,
+            'clones.seconds': self.clone_time,
+            'history.bytes': self.history_bytes,
+        }
+        for (name, seconds) in sorted(self.phases.items()):
+            stats['phase.{}.seconds'.format(name)] = seconds
+        for (player, histogram) in sorted(self.decisions.items()):
+            prefix = 'decision.player{}'.format(player)
+            stats[prefix + '.count'] = sum(histogram)
+            stats[prefix + '.seconds'] = self.decision_time[player]
+            for (bound, count) in zip(self.buckets, histogram):
+                stats['{}.le_{}us'.format(prefix, bound)] = count
+            stats[prefix + '.gt_{}us'.format(self.buckets[-1])] = histogram[-1]
+        return stats
+
+    def dump(self, path):
+        """
+        Writes the statistics to a JSON file.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.stats(), f, indent=2, sort_keys=True)
@@ -0,0 +1,244 @@
+"""
+This module contains the RegionIndex class, that keeps track of the connected
+regions of empty cells of a map.
+"""
+
+import numpy as np
+
+from tron.map import Tile
+from tron.bitboard import fill, from_bits, popcount, to_bits
+
+
+class RegionIndex:
+    """
+    This class keeps the connected regions of empty cells of a map, as
+    bitboards laid out like the inner array of the map, and their sizes.
+
+    It is updated each time a cell of the map changes. When a cell is filled,
+    it is removed from its region, which can only be split if the empty
+    neighbours of the cell are not connected around it: the regions are only
+    computed again with flood fills in that case, which is rare.
+
+    The id of the region of each cell, or -1 for the cells that are not empty,
+    is also kept in the ids array, so that finding the region of a cell is a
+    single read. When regions are split or merged, only the cells of the
+    smaller ones are given a new id.
+    """
+    def __init__(self, mmap):
+        """
+        Creates the index of the current regions of a map.
+        """
+        self.stride = mmap.height + 2
+        self.cells = (mmap.width + 2) * self.stride
+        s = self.stride
+        # The offsets of the neighbours of a cell, and of the ring of the 8
+        # cells around it, starting from the one above, the neighbours being
+        # at the even positions
+        self.neighbours = (-s, 1, s, -1)
+        self.ring = (-s, -s + 1, 1, s + 1, s, s - 1, -1, -s - 1)
+        self.reset(mmap)
+
+    def reset(self, mmap):
+        """
+        Computes the regions of a map of the same size again, in place, so
+        that the maps sharing the index see the new regions.
+        """
+        self.regions = {}
+        self.sizes = {}
+        self.ids = np.full(self.cells, -1, dtype=np.int32)
+        self._next = 0
+
+        free = to_bits(np.asarray(mmap.array()).ravel() == Tile.EMPTY.value)
+        while free:
+            seed = free & -free
+            region = fill(seed, free, self.stride)
+            self._add(region)
+            free &= ~region
+
+    def clone(self):
+        """
+        Creates a copy of the index.
+        """
+        clone = RegionIndex.__new__(RegionIndex)
+        clone.stride = self.stride
+        clone.cells = self.cells
+        clone.ids = self.ids.copy()
+        clone.neighbours = self.neighbours
+        clone.ring = self.ring
+        clone.regions = self.regions.copy()
+        clone.sizes = self.sizes.copy()
+        clone._next = self._next
+        return clone
+
+    def _add(self, region):
+        """
+        Adds a new region and returns its id.
+        """
+        id = self._next
+        self._next += 1
+        self._assign(id, region)
+        return id
+
+    def _assign(self, id, region):
+        """
+        Makes region the region id, and gives its id to its cells.
+        """
+        self.regions[id] = region
+        self.sizes[id] = popcount(region)
+        self.ids[from_bits(region, self.cells)] = id
+
+    def _index(self, position):
+        return int(position[0] + 1) * self.stride + int(position[1] + 1)
+
+    def _region_of(self, index):
+        """
+        Returns the id of the region containing a cell index, or None if the
+        cell is not empty.
+        """
+        if index < 0 or index >= self.cells:
+            return None
+        id = int(self.ids[index])
+        return None if id < 0 else id
+
+    def update(self, position, old, new):
+        """
+        Updates the index when the code of the tile at position changes from
+        old to new.
+        """
+        if old == new:
+            return
+        if old == Tile.EMPTY.value:
+            self.fill(position)
+        elif new == Tile.EMPTY.value:
+            self.clear(position)
+
+    def fill(self, position):
+        """
+        Removes an empty cell that has been filled.
+        """
+        index = self._index(position)
+        id = self._region_of(index)
+        if id is None:
+            return
+
+        region = self.regions[id] & ~(1 << index)
+        self.regions[id] = region
+        self.sizes[id] -= 1
+        self.ids[index] = -1
+        if not region:
+            del self.regions[id]
+            del self.sizes[id]
+            return
+
+        if self._connected_around(index, region):
+            return
+
+        # The region might be split: flood it from each empty neighbour which
+        # is not already in a part found before
+        neighbours = [index + o for o in self.neighbours if (region >> (index + o)) & 1]
+        parts = []
+        remaining = region
+        for neighbour in neighbours[:-1]:
+            if not (remaining >> neighbour) & 1:
+                continue
+            part = fill(1 << neighbour, remaining, self.stride)
+            if part == remaining:
+                break
+            parts.append(part)
+            remaining &= ~part
+        if not parts:
+            return
+
+        # The largest part keeps the id of the region, so that its cells do
+        # not need to be updated
+        parts.append(remaining)
+        parts.sort(key=popcount, reverse=True)
+        self.regions[id] = parts[0]
+        self.sizes[id] = popcount(parts[0])
+        for part in parts[1:]:
+            self._add(part)
+
+    def _connected_around(self, index, region):
+        """
+        Returns whether the empty neighbours of a cell are connected through
+        the 8 cells around it, in which case removing it cannot split its
+        region.
+        """
+        empty = [(region >> (index + o)) & 1 for o in self.ring]
+        if sum(empty[0::2]) <= 1 or all(empty):
+            return True
+
+        # Count the runs of consecutive empty cells of the ring containing a
+        # neighbour
+        runs = 0
+        start = empty.index(0)
+        in_run = False
+        has_neighbour = False
+        for k in range(start + 1, start + 9):
+            k %= 8
+            if empty[k]:
+                in_run = True
+                has_neighbour = has_neighbour or k % 2 == 0
+            elif in_run:
+                runs += has_neighbour
+                in_run = False
+                has_neighbour = False
+        return runs <= 1
+
+    def clear(self, position):
+        """
+        Adds a cell that has been emptied, merging the regions around it.
+        """
+        index = self._index(position)
+        ids = {self._region_of(index + o) for o in self.neighbours} - {None}
+        if not ids:
+            self._add(1 << index)
+            return
+
+        # The cells of the largest region keep their id
+        target = max(ids, key=lambda id: self.sizes[id])
+        merged = self.regions[target] | (1 << index)
+        self.ids[index] = target
+        for id in ids - {target}:
+            region = self.regions.pop(id)
+            del self.sizes[id]
+            merged |= region
+            self.ids[from_bits(region, self.cells)] = target
+        self.regions[target] = merged
+        self.sizes[target] = popcount(merged)
+
+    def region(self, position):
+        """
+        Returns the id of the region containing an empty cell, or None if the
+        cell is not empty.
+        """
+        return self._region_of(self._index(position))
+
+    def size(self, position):
+        """
+        Returns the size of the region containing an empty cell, or 0 if the
+        cell is not empty.
+        """
+        id = self.region(position)
+        return 0 if id is None else self.sizes[id]
+
+    def adjacent_regions(self, position):
+        """
+        Returns the ids of the regions next to a cell, like the head of a player.
+        """
+        index = self._index(position)
+        return {self._region_of(index + o) for o in self.neighbours} - {None}
+
+    def area(self, position):
+        """
+        Returns the number of empty cells that can be reached from a cell,
+        like the head of a player.
+        """
+        return sum(self.sizes[id] for id in self.adjacent_regions(position))
+
+    def connected(self, one, two):
+        """
+        Returns whether the players whose heads are at two positions can
+        still reach a same empty cell.
+        """
+        return bool(self.adjacent_regions(one) & self.adjacent_regions(two))
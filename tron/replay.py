@@ -0,0 +1,227 @@
+"""
+This module contains the replay files, that store games compactly on the disk.
+
+A replay file starts with a magic string, followed by the records of the
+games. Each record has a header with the size of the board, the number of
+players, the winner and the number of frames, then the start positions of the
+players as int16, the number of moves of each player as uint32, and finally
+the directions of the players at each frame, packed on 2 bits each. Since the
+players that are eliminated do not move anymore, the moves of a player are
+the first frames of the game: the directions are packed frame by frame, for
+the players that moved during the frame. The offsets of the records are
+stored in a separate index file, so that any game can be read without
+scanning the previous ones.
+"""
+
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
+
+from tron.map import TileMap, Tile
+from tron.player import Direction
+from tron.vecgame import MOVES
+
+MAGIC = b'TRONREP2'
+
+# Width, height, number of players, winner (0 for a draw) and number of frames
+HEADER = struct.Struct('<HHBbI')
+OFFSET = struct.Struct('<Q')
+
+
+def index_path(path):
+    """
+    Returns the path of the index of a replay file.
+    """
+    return path + '.idx'
+
+
+def pack_directions(directions):
+    """
+    Packs an array of direction values on 2 bits each.
+    """
+    values = np.asarray(directions, dtype=np.uint8).ravel() - 1
+    values = np.concatenate([values, np.zeros(-len(values) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    return (values[:, 0] | values[:, 1] << 2 | values[:, 2] << 4 | values[:, 3] << 6).astype(np.uint8).tobytes()
+
+
+def unpack_directions(data, count):
+    """
+    Unpacks count direction values packed by pack_directions.
+    """
+    packed = np.frombuffer(data, dtype=np.uint8)
+    values = (packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    return values.ravel()[:count] + 1
+
+
+class Replay:
+    """
+    A game read from a replay file.
+
+    It has a width, a height and a map method like Game, so that it can be
+    passed to a Window.
+    """
+    def __init__(self, width, height, starts, directions, winner):
+        """
+        Creates a replay from the start positions of the players, an array of
+        shape (players, 2), and the values of their directions at each frame,
+        an array of shape (frames, players), which are 0 once a player is
+        eliminated.
+        """
+        self.width = width
+        self.height = height
+        self.starts = starts
+        self.directions = directions
+        self.winner = winner
+
+    def players(self):
+        """
+        Returns the number of players of the game.
+        """
+        return len(self.starts)
+
+    def __len__(self):
+        """
+        Returns the number of frames of the game.
+        """
+        return len(self.directions)
+
+    def positions(self):
+        """
+        Returns the positions of the heads of the players at each step, as an
+        array of shape (frames + 1, players, 2).
+        """
+        moves = np.concatenate([self.starts[None], MOVES[self.directions]])
+        return np.cumsum(moves, axis=0)
+
+    def map(self):
+        """
+        Returns the map at the start of the game.
+        """
+        mmap = TileMap(self.width, self.height)
+        for (id, position) in enumerate(self.starts):
+            mmap[tuple(position)] = Tile.head(id + 1)
+        return mmap
+
+    def maps(self):
+        """
+        Yields the map at each step of the game.
+
+        The same map is updated in place and yielded at each step.
+        """
+        mmap = self.map()
+        yield mmap
+
+        positions = self.positions()
+        for frame in range(1, len(positions)):
+            for (id, position) in enumerate(positions[frame - 1]):
+                mmap[tuple(position)] = Tile.body(id + 1)
+            for (id, position) in enumerate(positions[frame]):
+                mmap[tuple(position)] = Tile.head(id + 1)
+            yield mmap
+
+    def player_directions(self, frame):
+        """
+        Returns the Direction of each player at a frame, None for the players
+        that were eliminated.
+        """
+        return [Direction(int(d)) if d else None for d in self.directions[frame]]
+
+
+class ReplayWriter:
+    """
+    This class appends games to a replay file.
+
+    It can be shared by several threads, each record being written at once.
+    """
+    def __init__(self, path):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        self._index = open(index_path(path), 'ab')
+        self._lock = threading.Lock()
+        if new:
+            self._file.write(MAGIC)
+
+    def write(self, game):
+        """
+        Appends a finished game, and returns its number in the file.
+        """
+        directions = game.history.moves()
+        starts = game.history.positions(0)
+        moved = directions != 0
+        record = HEADER.pack(game.width, game.height, len(starts), game.winner or 0, len(directions)) + \
+            struct.pack('<{}h'.format(2 * len(starts)), *(c for position in starts for c in position)) + \
+            struct.pack('<{}I'.format(len(starts)), *moved.sum(axis=0).tolist()) + \
+            pack_directions(directions[moved])
+
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(record)
+            self._index.write(OFFSET.pack(offset))
+            return (self._index.tell() // OFFSET.size) - 1
+
+    def flush(self):
+        """
+        Flushes the games written to the disk.
+        """
+        with self._lock:
+            self._file.flush()
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ReplayReader:
+    """
+    This class reads the games of a replay file.
+
+    It can be used as a list of Replay.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a replay file'.format(path))
+        self._offsets = np.fromfile(index_path(path), dtype='<u8')
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, k):
+        offset = int(self._offsets[k])
+        (width, height, players, winner, frames) = HEADER.unpack_from(self._data, offset)
+        offset += HEADER.size
+
+        starts = np.frombuffer(self._data, dtype='<i2', count=2 * players, offset=offset)
+        offset += 4 * players
+
+        moves = np.frombuffer(self._data, dtype='<u4', count=players, offset=offset)
+        offset += 4 * players
+
+        # A player moved during the frames before its number of moves
+        moved = np.arange(frames)[:, None] < moves
+        count = int(moved.sum())
+        directions = np.zeros((frames, players), dtype=np.int64)
+        directions[moved] = unpack_directions(self._data[offset:offset + (count + 3) // 4], count)
+
+        return Replay(width, height, starts.reshape(players, 2).astype(np.int64), directions, winner or None)
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def close(self):
+        self._data.close()
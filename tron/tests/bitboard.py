@@ -0,0 +1,89 @@
+import unittest
+from collections import deque
+
+import numpy as np
+
+from tron.bitboard import BitBoard, popcount
+from tron.game import Game, PositionPlayer
+from tron.map import TileMap, Tile
+from tron.player import Direction
+from tron.tests.players import ScriptedPlayer
+
+class TestBitBoard(unittest.TestCase):
+    def setUp(self):
+        self.mmap = TileMap(6, 5)
+        for y in range(4):
+            self.mmap[2, y] = Tile.PLAYER_ONE_BODY
+        self.mmap[2, 4] = Tile.PLAYER_ONE_HEAD
+        self.mmap[0, 0] = Tile.PLAYER_TWO_BODY
+        self.mmap[1, 0] = Tile.PLAYER_TWO_HEAD
+
+    def test_round_trip(self):
+        board = BitBoard.from_map(self.mmap)
+        self.assertTrue(np.array_equal(board.to_map().array(), self.mmap.array()))
+        self.assertEqual(board.heads, [board.index((2, 4)), board.index((1, 0))])
+
+    def test_from_tile_map(self):
+        mmap = TileMap(4, 4)
+        mmap[1, 2] = Tile.PLAYER_TWO_HEAD
+        board = BitBoard.from_map(mmap)
+        self.assertEqual(board.position(board.heads[1]), (1, 2))
+        self.assertIsNone(board.heads[0])
+        self.assertEqual(popcount(board.free()), 15)
+        self.assertEqual(BitBoard(4, 4).walls, board.walls)
+        self.assertEqual(BitBoard(6, 5).occupied, BitBoard.from_map(TileMap(6, 5)).occupied)
+
+    def test_fill(self):
+        board = BitBoard.from_map(self.mmap)
+        free = self.mmap.array() == Tile.EMPTY.value
+
+        # Breadth-first search from the neighbours of the head of player two
+        seen = set()
+        queue = deque([(1 + 1 + dx, 0 + 1 + dy) for (dx, dy) in ((-1, 0), (1, 0), (0, -1), (0, 1))])
+        while queue:
+            (i, j) = queue.popleft()
+            if (i, j) in seen or not free[i, j]:
+                continue
+            seen.add((i, j))
+            queue.extend([(i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)])
+
+        self.assertEqual(popcount(board.reachable(2)), len(seen))
+        self.assertEqual(popcount(board.reachable(1)), 3 * 5 + 8)
+        self.assertEqual(sorted(d.value for d in board.moves(1)), [1, 3])
+
+    def test_same_as_game(self):
+        rng = np.random.default_rng(0)
+        size = 6
+        for _ in range(100):
+            starts = rng.choice(size * size, 2, replace=False)
+            starts = [[int(s) // size, int(s) % size] for s in starts]
+            actions = rng.integers(1, 5, size=(size * size, 2))
+
+            game = Game(size, size, [
+                PositionPlayer(1, ScriptedPlayer(actions[:, 0]), list(starts[0])),
+                PositionPlayer(2, ScriptedPlayer(actions[:, 1]), list(starts[1])),
+            ])
+            game.main_loop()
+
+            board = BitBoard(size, size)
+            board.place(1, starts[0])
+            board.place(2, starts[1])
+            for (t, step) in enumerate(actions):
+                outcome = board.outcome(board.play([Direction(int(a)) for a in step]))
+                if outcome is not None:
+                    break
+
+            self.assertEqual(outcome, game.winner or 0)
+            self.assertEqual(t + 1, len(game.history) - 1)
+            self.assertTrue(np.array_equal(board.to_map().array(), game.map().array()))
+
+    def test_clone(self):
+        board = BitBoard.from_map(self.mmap)
+        clone = board.clone()
+        clone.play([Direction.DOWN, Direction.DOWN])
+        self.assertEqual(board.position(board.heads[0]), (2, 4))
+        self.assertTrue(np.array_equal(board.to_map().array(), self.mmap.array()))
+
+
+if __name__ == '__main__':
+    unittest.main()
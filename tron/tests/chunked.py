@@ -0,0 +1,118 @@
+import random
+import unittest
+
+import numpy as np
+
+from tron.chunked import ChunkedMap
+from tron.game import Game, PositionPlayer
+from tron.map import TileMap, Tile
+from tron.player import ConstantPlayer, Direction
+from tron.tests.players import RandomPlayer
+
+class TestChunkedMap(unittest.TestCase):
+    def test_same_as_tile_map(self):
+        rng = np.random.default_rng(0)
+        dense = TileMap(13, 9)
+        chunked = ChunkedMap(13, 9, 4)
+        self.assertTrue(np.array_equal(chunked.array(), dense.array()))
+
+        for _ in range(30):
+            position = (int(rng.integers(0, 13)), int(rng.integers(0, 9)))
+            tile = Tile(int(rng.integers(1, 5)))
+            dense[position] = tile
+            chunked[position] = tile
+        self.assertTrue(np.array_equal(chunked.array(), dense.array()))
+        self.assertEqual(chunked[12, 8], dense[12, 8])
+        self.assertEqual(chunked[-1, 3], Tile.WALL)
+
+        cells = rng.integers(0, 15 * 11, size=20)
+        self.assertTrue(np.array_equal(chunked.take(cells), dense.take(cells)))
+
+        for position in ((0, 0), (6, 4), (12, 8), (-5, 20), (40, 40)):
+            for size in (5, 12):
+                crop = dense.crop(position, size)
+                self.assertTrue(np.array_equal(chunked.crop(position, size), crop))
+                state = dense.state_around(2, position, size)
+                self.assertTrue(np.array_equal(chunked.state_around(2, position, size), state))
+
+    def test_crop(self):
+        mmap = TileMap(10, 10)
+        mmap[4, 7] = Tile.PLAYER_ONE_HEAD
+        state = mmap.state_around(1, (4, 7), 12)
+        # The head is at the center, and the square goes beyond the borders
+        self.assertEqual(state[6, 6], 10)
+        self.assertTrue(np.array_equal(state[:10, 6], mmap.state_for_player(1)[2:, 5]))
+        self.assertTrue(np.all(state[10:] == -1))
+        self.assertTrue(np.array_equal(mmap.observation(1, (4, 7), 12), mmap.state_for_player(1)))
+
+    def test_lazy_chunks(self):
+        mmap = ChunkedMap(1000, 1000, 32)
+        view = mmap.view()
+        self.assertEqual(mmap.nbytes(), 0)
+        mmap[500, 500] = Tile.PLAYER_ONE_HEAD
+        self.assertEqual(len(mmap.chunks), 1)
+        self.assertEqual(view[500, 500], Tile.PLAYER_ONE_HEAD)
+        self.assertEqual(mmap.crop((998, 999), 4)[3, 3], Tile.WALL.value)
+        self.assertEqual(len(mmap.chunks), 1)
+        with self.assertRaises(ValueError):
+            view[0, 0] = Tile.PLAYER_TWO_HEAD
+
+        self.assertEqual(mmap.clone_array().shape, (1002, 1002))
+        clone = mmap.clone()
+        mmap.clear()
+        self.assertEqual(mmap[500, 500], Tile.EMPTY)
+        self.assertEqual(clone[500, 500], Tile.PLAYER_ONE_HEAD)
+
+    def test_same_game(self):
+        random.seed(3)
+        for k in range(10):
+            state = random.getstate()
+            games = []
+            for chunk_size in (None, 4):
+                random.setstate(state)
+                game = Game(17, 11, [
+                    PositionPlayer(1, RandomPlayer(), [k, 0]),
+                    PositionPlayer(2, RandomPlayer(), [16, 10 - k]),
+                    PositionPlayer(3, RandomPlayer(), [8, 5]),
+                ], chunk_size=chunk_size)
+                game.main_loop()
+                games.append(game)
+            (dense, chunked) = games
+            self.assertEqual(chunked.winner, dense.winner)
+            self.assertEqual(chunked.history.moves().tolist(), dense.history.moves().tolist())
+            for step in range(len(dense.history)):
+                expected = dense.history[step].map.array()
+                self.assertTrue(np.array_equal(chunked.history[step].map.array(), expected))
+
+    def test_dense_methods(self):
+        mmap = ChunkedMap(4, 4, 3)
+        mmap[1, 2] = Tile.PLAYER_TWO_HEAD
+        dense = mmap.to_tile_map()
+        self.assertEqual(dense[1, 2], Tile.PLAYER_TWO_HEAD)
+        self.assertTrue(np.array_equal(mmap.clone_array(), dense.array()))
+        values = dense.apply(lambda tile: tile.value).array()
+        self.assertTrue(np.array_equal(mmap.apply(lambda tile: tile.value).array(), values))
+
+        players = [PositionPlayer(1, ConstantPlayer(Direction.UP), [0, 0])]
+        for options in ({'regions': True}, {'observations': True}):
+            with self.assertRaises(ValueError):
+                Game(5, 3, players, chunk_size=2, **options)
+
+    def test_large_arena(self):
+        game = Game(2000, 2000, [
+            PositionPlayer(1, ConstantPlayer(Direction.RIGHT), [1000, 1000]),
+            PositionPlayer(2, ConstantPlayer(Direction.LEFT), [1500, 1800]),
+        ], chunk_size=64)
+        game.main_loop()
+        self.assertEqual(game.winner, 2)
+        # Only the rows of chunks crossed by the players are allocated
+        self.assertLess(game.map().nbytes(), 2002 * 64 * 2)
+        # The dense exports would allocate the whole board at every step
+        with self.assertRaises(ValueError):
+            game.history.codes()
+        with self.assertRaises(ValueError):
+            game.trajectory()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from tron.env import TronEnv, VecTronEnv
+from tron.game import Game, PositionPlayer
+from tron.tests.players import ScriptedPlayer
+
+class TestEnv(unittest.TestCase):
+    def test_same_as_game(self):
+        rng = np.random.default_rng(0)
+        env = TronEnv(6, 6, seed=0)
+        for _ in range(50):
+            starts = [[int(c) for c in divmod(int(s), 6)] for s in rng.choice(36, 2, replace=False)]
+            actions = rng.integers(0, 4, size=(36, 2))
+            game = Game(6, 6, [
+                PositionPlayer(1, ScriptedPlayer(actions[:, 0] + 1), list(starts[0])),
+                PositionPlayer(2, ScriptedPlayer(actions[:, 1] + 1), list(starts[1])),
+            ])
+
+            game.main_loop()
+
+            observations = env.reset(starts)
+            steps = 0
+            while True:
+                mmap = game.history[steps].map
+                for p in (1, 2):
+                    self.assertTrue(np.array_equal(observations[p - 1], mmap.state_for_player(p)))
+                (observations, rewards, done, infos) = env.step(actions[steps])
+                steps += 1
+                if done:
+                    break
+                self.assertTrue(np.all(rewards == 0))
+
+            self.assertEqual(steps, len(game.history) - 1)
+            self.assertEqual(infos['winner'], game.winner or 0)
+            expected = [1 if game.winner == p else -1 for p in (1, 2)]
+            self.assertEqual(rewards.tolist(), expected)
+            with self.assertRaises(RuntimeError):
+                env.step([0, 0])
+
+    def test_vectorized(self):
+        env = VecTronEnv(32, 5, 4, seed=1)
+        observations = env.reset()
+        self.assertEqual(observations.shape, (32, 2, 6, 7))
+        rng = np.random.default_rng(2)
+        finished = 0
+        for _ in range(30):
+            (next_observations, rewards, dones, infos) = env.step(rng.integers(0, 4, size=(32, 2)))
+            self.assertIs(next_observations, observations)
+            self.assertTrue(np.all(rewards[~dones] == 0))
+            if dones.any():
+                finished += dones.sum()
+                self.assertEqual(len(infos['final_observations']), dones.sum())
+                self.assertTrue(np.all(np.abs(rewards[dones]) == 1))
+                won = infos['winner'][dones] > 0
+                self.assertTrue(np.all(rewards[dones][won].sum(axis=1) == 0))
+                # The new games have just started
+                self.assertTrue(np.all(env.game.frames[dones] == 0))
+        self.assertGreater(finished, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+
+import numpy as np
+
+from tron.game import Game, GamePool, PositionPlayer
+from tron.map import Map, TileMap, Tile
+from tron.player import Direction
+from tron.regions import RegionIndex
+from tron.tests.players import ScriptedPlayer
+
+class TestGame(unittest.TestCase):
+    def play(self, game):
+        game.main_loop()
+        return (game.winner, game.history.moves().tolist(), game.map().array().tolist(),
+                [game.history.map(step).array().tolist() for step in range(len(game.history))])
+
+    def test_reset(self):
+        rng = np.random.default_rng(0)
+        actions = rng.integers(1, 5, size=(2, 1000))
+        players = [ScriptedPlayer(actions[0]), ScriptedPlayer(actions[1])]
+        game = Game(8, 8, [
+            PositionPlayer(1, players[0], [0, 0]),
+            PositionPlayer(2, players[1], [7, 7]),
+        ], regions=True, observations=True)
+        self.play(game)
+
+        for _ in range(20):
+            starts = [[int(c) for c in divmod(int(s), 8)] for s in rng.choice(64, 2, replace=False)]
+            steps = [p.step for p in players]
+            game.reset(starts)
+            # The view given to the players shares the index of the new game
+            self.assertIs(game.player_map().regions, game._map.regions)
+            self.assertEqual(game.player_map().regions.size((3, 3)), RegionIndex(game._map).size((3, 3)))
+            reused = self.play(game)
+
+            fresh_players = [ScriptedPlayer(actions[k]) for k in range(2)]
+            for (player, step) in zip(fresh_players, steps):
+                player.step = step
+            fresh = self.play(Game(8, 8, [
+                PositionPlayer(1, fresh_players[0], list(starts[0])),
+                PositionPlayer(2, fresh_players[1], list(starts[1])),
+            ]))
+            self.assertEqual(reused, fresh)
+
+    def test_pool(self):
+        pool = GamePool(5, 5, [lambda: ScriptedPlayer([2]), lambda: ScriptedPlayer([4])])
+        game = pool.acquire([[0, 0], [4, 4]])
+        game.main_loop()
+        pool.release(game)
+        self.assertIs(pool.acquire([[1, 0], [3, 4]]), game)
+        self.assertEqual(game.map()[1, 0], Tile.PLAYER_ONE_HEAD)
+        self.assertIsNone(game.winner)
+        self.assertIsNot(pool.acquire([[0, 0], [4, 4]]), game)
+
+    def test_templates(self):
+        for (w, h) in ((3, 3), (4, 6), (7, 2)):
+            for (empty, wall) in ((0, -1), (Tile.EMPTY, Tile.WALL)):
+                mmap = Map(w, h, empty, wall)
+                self.assertEqual(mmap.array().shape, (w + 2, h + 2))
+                for i in range(w + 2):
+                    for j in range(h + 2):
+                        border = i in (0, w + 1) or j in (0, h + 1)
+                        self.assertEqual(mmap.array()[i, j], wall if border else empty)
+            mmap = TileMap(w, h)
+            mmap[0, 0] = Tile.PLAYER_ONE_HEAD
+            mmap.clear()
+            self.assertTrue(np.array_equal(mmap.array(), TileMap(w, h).array()))
+
+    def free_for_all(self, **options):
+        return Game(6, 6, [
+            PositionPlayer(1, ScriptedPlayer([2]), [0, 0]),
+            PositionPlayer(2, ScriptedPlayer([4]), [0, 2]),
+            PositionPlayer(3, ScriptedPlayer([2]), [3, 3]),
+            PositionPlayer(4, ScriptedPlayer([1]), [5, 1]),
+        ], **options)
+
+    def test_free_for_all(self):
+        game = self.free_for_all()
+        game.main_loop()
+
+        # Players one and two collide head-on in the first frame, player three
+        # hits the wall in the third one
+        self.assertEqual(game.winner, 4)
+        self.assertEqual([pp.alive for pp in game.pps], [False, False, False, True])
+        self.assertEqual(game.history.moves().tolist(), [[2, 4, 2, 1], [0, 0, 2, 1], [0, 0, 2, 1]])
+        self.assertEqual(game.map()[0, 1], Tile.PLAYER_TWO_HEAD)
+        self.assertEqual(game.map()[0, 0], Tile.PLAYER_ONE_BODY)
+        self.assertEqual(game.map()[2, 1], Tile.PLAYER_FOUR_HEAD)
+        self.assertEqual(game.history[1].directions, [None, None, Direction.RIGHT, Direction.UP])
+
+        codes = game.history.codes()
+        for step in range(len(game.history)):
+            self.assertTrue(np.array_equal(game.history.map(step).array(), codes[step]))
+
+        trajectory = game.trajectory()
+        self.assertEqual(trajectory.dones.tolist(), [[True, True, False, False], [False] * 4, [False, False, True, True]])
+        self.assertEqual(trajectory.rewards[-1].tolist(), [0, 0, -1, 1])
+        self.assertEqual(trajectory.actions[1].tolist(), [-1, -1, 1, 0])
+
+    def test_free_for_all_tracking(self):
+        game = self.free_for_all(regions=True, observations=True)
+        game.main_loop()
+        self.assertEqual(game.winner, 4)
+        for p in range(1, 5):
+            self.assertTrue(np.array_equal(game.map().state_for_player(p), game.map().perception_table(p)[game.map().array().T]))
+        self.assertEqual(game.map().state_for_player(4)[2, 3], 10)
+        self.assertEqual(game.map().state_for_player(3)[2, 3], -10)
+
+    def test_too_many_players(self):
+        with self.assertRaises(ValueError):
+            Game(10, 10, [PositionPlayer(id + 1, ScriptedPlayer([1]), [id, 0]) for id in range(9)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+from tron.player import Player, Direction
+
+class TurningPlayer(Player):
+    def __init__(self, directions):
+        super(TurningPlayer, self).__init__()
+        self.directions = iter(directions)
+
+    def action(self, map, id):
+        return next(self.directions)
+
+class TestHistory(unittest.TestCase):
+    def test_replay(self):
+        spiral = [Direction.RIGHT] * 9 + [Direction.DOWN] * 9 + [Direction.LEFT] * 9 + \
+            [Direction.UP] * 8 + [Direction.RIGHT] * 3
+        game = Game(10, 10, [
+            PositionPlayer(1, TurningPlayer(spiral), [0, 0]),
+            PositionPlayer(2, TurningPlayer([Direction.UP] * 9), [9, 4]),
+        ])
+        game.history.keyframe_interval = 4
+
+        maps = [game.map()]
+        while game.next_frame():
+            maps.append(game.map())
+            if not all(pp.alive for pp in game.pps):
+                break
+
+        self.assertEqual(len(game.history), len(maps))
+        for step in range(len(maps)):
+            self.assertTrue(np.array_equal(game.history[step].map.array(), maps[step].array()))
+        self.assertTrue(np.array_equal(game.history[-1].map.array(), maps[-1].array()))
+
+        self.assertEqual(game.history[0].player_one_direction, Direction.RIGHT)
+        self.assertEqual(game.history[0].player_two_direction, Direction.UP)
+        self.assertIsNone(game.history[-1].player_one_direction)
+
+        codes = game.history.codes()
+        for step in range(len(maps)):
+            self.assertTrue(np.array_equal(codes[step], maps[step].array()))
+
+    def test_trajectory(self):
+        game = Game(6, 6, [
+            PositionPlayer(1, TurningPlayer([Direction.DOWN] * 5), [0, 2]),
+            PositionPlayer(2, TurningPlayer([Direction.LEFT] * 5), [3, 5]),
+        ])
+        game.main_loop()
+        trajectory = game.trajectory()
+        moves = len(game.history) - 1
+
+        self.assertEqual(trajectory.observations.shape, (moves, 2, 8, 8))
+        for step in range(moves):
+            for p in range(1, 3):
+                expected = game.history[step].map.state_for_player(p)
+                self.assertTrue(np.array_equal(trajectory.observations[step, p - 1], expected))
+        self.assertEqual(trajectory.actions.tolist(), [[2, 3]] * moves)
+        expected = [1 if game.winner == p else -1 for p in range(1, 3)]
+        self.assertEqual(trajectory.rewards[-1].tolist(), expected)
+        self.assertEqual(trajectory.dones.sum(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
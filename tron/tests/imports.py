@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+
+HEADLESS = """
+import sys
+from tron.game import Game, PositionPlayer
+from tron.player import Direction, ConstantPlayer, KeyboardPlayer
+from tron import bitboard, history, observations, profiler, regions, replay, tournament, vecgame
+from ais.alphabeta.ai import Ai
+
+game = Game(10, 10, [
+    PositionPlayer(1, ConstantPlayer(Direction.RIGHT), [0, 0]),
+    PositionPlayer(2, Ai(), [9, 9]),
+], regions=True, observations=True)
+game.main_loop()
+KeyboardPlayer(Direction.UP).action(game.map(), 1)
+print(sorted(m for m in ('pygame', 'torch') if m in sys.modules))
+"""
+
+class TestImports(unittest.TestCase):
+    def test_headless(self):
+        # A headless game should load neither pygame nor torch
+        output = subprocess.check_output([sys.executable, '-c', HEADLESS], cwd=ROOT)
+        self.assertEqual(output.strip(), b'[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
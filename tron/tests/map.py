@@ -1,6 +1,6 @@
 import unittest
 
-from tron.map import Map
+from tron.map import Map, TileMap, Tile
 
 class TestMap(unittest.TestCase):
     def test_constructor(self):
@@ -39,5 +39,41 @@ class TestMap(unittest.TestCase):
                 self.assertEqual(converted._data[i][j], original._data[i][j] + 1)
 
 
+class TestTileMap(unittest.TestCase):
+    def test_constructor(self):
+        mymap = TileMap(3, 3)
+        reference = Map(3, 3, Tile.EMPTY, Tile.WALL)
+        for i in range(5):
+            for j in range(5):
+                self.assertEqual(Tile(mymap._data[i][j]), reference._data[i][j])
+
+    def test_items(self):
+        mymap = TileMap(3, 3)
+        mymap[1, 2] = Tile.PLAYER_TWO_HEAD
+        self.assertIs(mymap[1, 2], Tile.PLAYER_TWO_HEAD)
+        self.assertIs(mymap[0, 0], Tile.EMPTY)
+        self.assertIs(mymap[-1, 0], Tile.WALL)
+
+    def test_clone(self):
+        mymap = TileMap(3, 3)
+        mymap2 = mymap.clone()
+        mymap[0, 0] = Tile.PLAYER_ONE_BODY
+        self.assertIs(mymap2[0, 0], Tile.EMPTY)
+
+    def test_state_for_player(self):
+        original = Map(4, 4, Tile.EMPTY, Tile.WALL)
+        mymap = TileMap(4, 4)
+        for (position, tile) in [((0, 0), Tile.PLAYER_ONE_BODY),
+                                 ((0, 1), Tile.PLAYER_ONE_HEAD),
+                                 ((3, 2), Tile.PLAYER_TWO_BODY),
+                                 ((2, 2), Tile.PLAYER_TWO_HEAD)]:
+            original[position] = tile
+            mymap[position] = tile
+
+        for p in range(1, 3):
+            expected = original.state_for_player(p)
+            self.assertEqual(mymap.state_for_player(p).tolist(), expected.tolist())
+
+
 if __name__ == '__main__':
     unittest.main()
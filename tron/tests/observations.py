@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+from tron.map import TileMap, Tile
+from tron.player import Player, Direction
+
+class CheckingPlayer(Player):
+    """
+    A random player checking that its observation is the perception of the
+    map it is given.
+    """
+    def __init__(self, test, rng):
+        super(CheckingPlayer, self).__init__()
+        self.test = test
+        self.rng = rng
+        self.maps = []
+
+    def action(self, map, id):
+        expected = map.perception_table(id)[map.array().T]
+        self.test.assertTrue(np.array_equal(map.observations.array(id), expected))
+        self.test.assertTrue(np.array_equal(map.state_for_player(id), expected))
+        self.maps.append(map)
+        return Direction(int(self.rng.integers(1, 5)))
+
+class TestObservations(unittest.TestCase):
+    def test_game(self):
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            players = [CheckingPlayer(self, rng), CheckingPlayer(self, rng)]
+            game = Game(6, 5, [
+                PositionPlayer(1, players[0], [0, 0]),
+                PositionPlayer(2, players[1], [5, 4]),
+            ], observations=True)
+            game.main_loop()
+
+            # The players are always given the same view, without any copy
+            self.assertTrue(all(m is players[0].maps[0] for p in players for m in p.maps))
+
+    def test_buffers(self):
+        mmap = TileMap(4, 3)
+        observations = mmap.track_observations(2)
+        state = observations.array(1)
+        copy = mmap.state_for_player(1)
+        mmap[1, 2] = Tile.PLAYER_ONE_HEAD
+        mmap[3, 0] = Tile.PLAYER_TWO_HEAD
+
+        self.assertEqual(state.dtype, np.float32)
+        self.assertEqual(state[3, 2], 10)
+        self.assertEqual(observations.array(2)[3, 2], -10)
+        self.assertEqual(observations.array(2)[1, 4], 10)
+        self.assertEqual(observations.tensor(1).shape, (1, 1, 5, 6))
+
+        # state_for_player returns a copy, of the same type as without observations
+        self.assertEqual(copy.dtype, np.int8)
+        self.assertEqual(copy[3, 2], 1)
+        self.assertEqual(mmap.state_for_player(1).dtype, TileMap(4, 3).state_for_player(1).dtype)
+        self.assertTrue(np.array_equal(mmap.state_for_player(2), observations.array(2)))
+
+        clone = mmap.clone()
+        clone[0, 0] = Tile.PLAYER_ONE_BODY
+        self.assertEqual(clone.observations.array(1)[1, 1], -1)
+        self.assertEqual(clone.state_for_player(1)[1, 1], -1)
+        self.assertEqual(state[1, 1], 1)
+
+    def test_view(self):
+        mmap = TileMap(4, 3)
+        view = mmap.view()
+        mmap[1, 1] = Tile.PLAYER_ONE_HEAD
+        self.assertIs(view[1, 1], Tile.PLAYER_ONE_HEAD)
+        with self.assertRaises(ValueError):
+            view[0, 0] = Tile.PLAYER_TWO_HEAD
+        clone = view.clone()
+        clone[0, 0] = Tile.PLAYER_TWO_HEAD
+        self.assertIs(mmap[0, 0], Tile.EMPTY)
+
+
+if __name__ == '__main__':
+    unittest.main()
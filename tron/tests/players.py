@@ -0,0 +1,35 @@
+"""
+The players shared by the tests.
+"""
+
+import random
+
+from tron.player import Player, Direction
+
+class ScriptedPlayer(Player):
+    """
+    A player taking the directions of a list of values in turn, starting over
+    at the end of the list.
+    """
+    def __init__(self, actions):
+        super(ScriptedPlayer, self).__init__()
+        self.actions = actions
+        self.step = 0
+
+    def action(self, map, id):
+        self.step += 1
+        return Direction(int(self.actions[(self.step - 1) % len(self.actions)]))
+
+class RandomPlayer(Player):
+    """
+    A player taking random directions, from a NumPy generator if one is
+    given, and from the random module otherwise.
+    """
+    def __init__(self, rng = None):
+        super(RandomPlayer, self).__init__()
+        self.rng = rng
+
+    def action(self, map, id):
+        if self.rng is None:
+            return Direction(random.randint(1, 4))
+        return Direction(int(self.rng.integers(1, 5)))
@@ -0,0 +1,31 @@
+import unittest
+
+from tron.game import Game, PositionPlayer
+from tron.player import ConstantPlayer, Direction
+from tron.profiler import GameProfiler
+
+class TestGameProfiler(unittest.TestCase):
+    def test_stats(self):
+        profiler = GameProfiler()
+        for i in range(3):
+            game = Game(10, 10, [
+                PositionPlayer(1, ConstantPlayer(Direction.RIGHT), [i, 0]),
+                PositionPlayer(2, ConstantPlayer(Direction.LEFT), [9, 9]),
+            ], profiler)
+            game.main_loop()
+
+        stats = profiler.stats()
+        self.assertEqual(stats['games'], 3)
+        self.assertEqual(stats['frames'], 30)
+        self.assertEqual(stats['clones'], 60)
+        self.assertEqual(stats['clones.bytes'], 60 * 144)
+        for player in (1, 2):
+            prefix = 'decision.player{}'.format(player)
+            buckets = sum(v for (k, v) in stats.items()
+                          if k.startswith(prefix + '.le_') or k.startswith(prefix + '.gt_'))
+            self.assertEqual(stats[prefix + '.count'], 30)
+            self.assertEqual(buckets, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
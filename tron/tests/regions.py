@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+from tron.bitboard import from_bits
+from tron.map import TileMap, Tile
+from tron.tests.players import RandomPlayer
+
+def labels(mmap):
+    """
+    Returns the regions of empty cells of a map as sets of positions, computed
+    with a depth-first search.
+    """
+    empty = mmap.array()[1:-1, 1:-1] == Tile.EMPTY.value
+    seen = set()
+    regions = []
+    for start in zip(*np.nonzero(empty)):
+        if start in seen:
+            continue
+        region = set()
+        stack = [start]
+        while stack:
+            (i, j) = stack.pop()
+            if (i, j) in seen or not (0 <= i < mmap.width and 0 <= j < mmap.height) or not empty[i, j]:
+                continue
+            seen.add((i, j))
+            region.add((i, j))
+            stack.extend([(i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)])
+        regions.append(region)
+    return regions
+
+class TestRegionIndex(unittest.TestCase):
+    def check(self, mmap):
+        index = mmap.regions
+        expected = labels(mmap)
+        self.assertEqual(len(index.regions), len(expected))
+        # The ids of the cells are the regions containing them
+        self.assertTrue(np.array_equal(index.ids >= 0, mmap.array().ravel() == Tile.EMPTY.value))
+        for (id, region) in index.regions.items():
+            self.assertTrue(np.array_equal(index.ids == id, from_bits(region, index.cells)))
+        for region in expected:
+            ids = {index.region(position) for position in region}
+            self.assertEqual(len(ids), 1)
+            self.assertEqual(index.size(next(iter(region))), len(region))
+
+    def test_random_fills(self):
+        rng = np.random.default_rng(0)
+        for _ in range(5):
+            mmap = TileMap(8, 7)
+            mmap.track_regions()
+            for cell in rng.permutation(8 * 7):
+                mmap[divmod(int(cell), 7)] = Tile.PLAYER_ONE_BODY
+                self.check(mmap)
+            self.assertEqual(len(mmap.regions.regions), 0)
+
+    def test_clear(self):
+        mmap = TileMap(5, 5)
+        for x in range(5):
+            mmap[x, 2] = Tile.PLAYER_ONE_BODY
+        mmap.track_regions()
+        self.assertEqual(len(mmap.regions.regions), 2)
+        mmap[3, 2] = Tile.EMPTY
+        self.check(mmap)
+        self.assertEqual(mmap.regions.size((0, 0)), 21)
+
+    def test_clone(self):
+        mmap = TileMap(5, 5)
+        mmap.track_regions()
+        clone = mmap.clone()
+        for y in range(5):
+            clone[2, y] = Tile.PLAYER_ONE_BODY
+        self.assertEqual(len(clone.regions.regions), 2)
+        self.assertEqual(len(mmap.regions.regions), 1)
+
+    def test_game(self):
+        rng = np.random.default_rng(1)
+        for _ in range(20):
+            game = Game(6, 6, [
+                PositionPlayer(1, RandomPlayer(rng), [0, 0]),
+                PositionPlayer(2, RandomPlayer(rng), [5, 5]),
+            ], regions=True)
+            game.main_loop()
+            mmap = game.map()
+            self.check(mmap)
+
+            # The areas of the players are the sum of the sizes of the regions
+            # next to their heads
+            for pp in game.pps:
+                (x, y) = pp.position
+                around = [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
+                regions = [r for r in labels(mmap) if any(p in r for p in around)]
+                self.assertEqual(mmap.regions.area(pp.position), sum(len(r) for r in regions))
+
+    def test_connected(self):
+        mmap = TileMap(5, 5)
+        mmap[0, 0] = Tile.PLAYER_ONE_HEAD
+        mmap[4, 4] = Tile.PLAYER_TWO_HEAD
+        mmap.track_regions()
+        self.assertTrue(mmap.regions.connected((0, 0), (4, 4)))
+        for x in range(5):
+            mmap[x, 2] = Tile.PLAYER_ONE_BODY
+        self.assertFalse(mmap.regions.connected((0, 0), (4, 4)))
+        self.assertEqual(mmap.regions.area((0, 0)), 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
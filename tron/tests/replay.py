@@ -0,0 +1,69 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+from tron.replay import ReplayWriter, ReplayReader
+from tron.tests.players import RandomPlayer
+
+class TestReplay(unittest.TestCase):
+    def test_write_read(self):
+        random.seed(0)
+        path = os.path.join(tempfile.mkdtemp(), 'games.replay')
+        games = []
+        with ReplayWriter(path) as writer:
+            for k in range(20):
+                game = Game(8, 8, [
+                    PositionPlayer(1, RandomPlayer(), [k % 8, 0]),
+                    PositionPlayer(2, RandomPlayer(), [7, 7]),
+                ])
+                game.main_loop()
+                self.assertEqual(writer.write(game), k)
+                games.append(game)
+
+        # Appending to an existing file keeps the previous games
+        with ReplayWriter(path) as writer:
+            self.assertEqual(writer.write(games[0]), 20)
+
+        replays = ReplayReader(path)
+        self.assertEqual(len(replays), 21)
+        for k in (13, 2, 20):
+            game = games[k % 20]
+            replay = replays[k]
+            self.assertEqual(replay.winner, game.winner)
+            self.assertEqual(len(replay), len(game.history) - 1)
+            self.assertEqual(replay.player_directions(0), [game.history[0].player_one_direction, game.history[0].player_two_direction])
+            for (step, mmap) in enumerate(replay.maps()):
+                self.assertTrue(np.array_equal(mmap.array(), game.history[step].map.array()))
+        replays.close()
+
+    def test_eliminated_players(self):
+        random.seed(1)
+        path = os.path.join(tempfile.mkdtemp(), 'games.replay')
+        game = Game(12, 12, [PositionPlayer(id + 1, RandomPlayer(), [id * 3, id * 2]) for id in range(4)])
+        game.main_loop()
+        with ReplayWriter(path) as writer:
+            writer.write(game)
+
+        replays = ReplayReader(path)
+        replay = replays[0]
+        self.assertEqual(replay.players(), 4)
+        self.assertEqual(replay.winner, game.winner)
+        self.assertEqual(replay.directions.tolist(), game.history.moves().tolist())
+        for (step, mmap) in enumerate(replay.maps()):
+            self.assertTrue(np.array_equal(mmap.array(), game.history[step].map.array()))
+        replays.close()
+
+    def test_not_a_replay(self):
+        path = os.path.join(tempfile.mkdtemp(), 'games.replay')
+        with open(path, 'wb') as f:
+            f.write(b'TRONREP1')
+        with self.assertRaises(ValueError):
+            ReplayReader(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
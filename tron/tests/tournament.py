@@ -0,0 +1,63 @@
+import unittest
+from functools import partial
+
+import numpy as np
+
+from tron.player import Direction, ConstantPlayer
+from tron.tournament import Tournament, play_games
+
+
+class TestTournament(unittest.TestCase):
+
+    def setUp(self):
+        self.factories = {
+            'up': partial(ConstantPlayer, Direction.UP),
+            'right': partial(ConstantPlayer, Direction.RIGHT),
+            'left': partial(ConstantPlayer, Direction.LEFT),
+        }
+
+    def test_play_games(self):
+        results = play_games(self.factories['up'], self.factories['right'], 10, 10, range(5))
+        self.assertEqual(sum(results), 10)
+
+    def test_play_games_same_player(self):
+        # With swapped sides, identical players win as many games each
+        (one, two, _) = play_games(self.factories['up'], self.factories['up'], 10, 10, range(20))
+        self.assertEqual(one, two)
+
+    def test_run(self):
+        tournament = Tournament(self.factories, 10, 10, 20, workers=0, chunk_size=3)
+        updates = sum(1 for _ in tournament.run())
+        self.assertEqual(updates, 3 * 4)
+
+        games = tournament.games()
+        self.assertTrue(np.array_equal(games, 20 * (1 - np.eye(3, dtype=np.int64))))
+        self.assertTrue(np.array_equal(tournament.draws, tournament.draws.T))
+
+    def test_odd_games_per_pairing(self):
+        with self.assertRaises(ValueError):
+            Tournament(self.factories, 10, 10, 7, workers=0)
+
+    def test_run_processes(self):
+        serial = Tournament(self.factories, 10, 10, 10, workers=0)
+        for _ in serial.run():
+            pass
+        parallel = Tournament(self.factories, 10, 10, 10, workers=2, chunk_size=2)
+        for _ in parallel.run():
+            pass
+        self.assertTrue(np.array_equal(serial.wins, parallel.wins))
+        self.assertTrue(np.array_equal(serial.draws, parallel.draws))
+
+    def test_ratings(self):
+        tournament = Tournament(self.factories, 10, 10, 0, workers=0)
+        tournament.record(0, 1, (30, 10, 0))
+        tournament.record(0, 2, (30, 10, 0))
+        tournament.record(1, 2, (20, 20, 0))
+        ratings = tournament.ratings()
+        self.assertAlmostEqual(ratings.mean(), 1500)
+        self.assertGreater(ratings[0], ratings[1])
+        self.assertAlmostEqual(ratings[1], ratings[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
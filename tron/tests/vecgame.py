@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+from tron.tests.players import ScriptedPlayer
+from tron.vecgame import VecGame
+
+class TestVecGame(unittest.TestCase):
+    def test_reset(self):
+        games = VecGame(50, 4, 4, seed=0)
+        for k in range(50):
+            (p1, p2) = games.positions[k]
+            self.assertFalse(np.array_equal(p1, p2))
+            self.assertEqual(games.board[k, p1[0] + 1, p1[1] + 1], 2)
+            self.assertEqual(games.board[k, p2[0] + 1, p2[1] + 1], 4)
+
+    def test_same_as_game(self):
+        n = 200
+        width = 6
+        height = 6
+        games = VecGame(n, width, height, seed=1)
+        starts = games.positions.copy()
+        rng = np.random.default_rng(2)
+        actions = rng.integers(1, 5, size=(width * height, n, 2))
+
+        winners = np.full(n, -1)
+        durations = np.zeros(n, dtype=int)
+        for t in range(width * height):
+            (done, winner) = games.step(actions[t])
+            for k in np.flatnonzero(done):
+                if winners[k] == -1:
+                    winners[k] = winner[k]
+                    durations[k] = t + 1
+
+        self.assertTrue(np.all(winners != -1))
+        for k in range(n):
+            game = Game(width, height, [
+                PositionPlayer(1, ScriptedPlayer(actions[:, k, 0]), list(starts[k, 0])),
+                PositionPlayer(2, ScriptedPlayer(actions[:, k, 1]), list(starts[k, 1])),
+            ])
+            game.main_loop()
+            self.assertEqual(winners[k], game.winner or 0)
+            self.assertEqual(durations[k], len(game.history) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
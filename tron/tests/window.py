@@ -0,0 +1,51 @@
+import os
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from tron.game import Game, PositionPlayer
+from tron.player import ConstantPlayer, Direction, KeyboardPlayer, Mode
+from tron.window import Window
+
+class TestWindow(unittest.TestCase):
+    def test_incremental_rendering(self):
+        pygame.init()
+        game = Game(10, 10, [
+            PositionPlayer(1, ConstantPlayer(Direction.RIGHT), [2, 0]),
+            PositionPlayer(2, ConstantPlayer(Direction.UP), [9, 5]),
+        ])
+        window = Window(game, 7)
+        for _ in range(6):
+            game.next_frame()
+            window.render_map(game.map())
+        incremental = pygame.surfarray.array3d(window.screen)
+
+        window.reset()
+        window.render_map(game.map())
+        full = pygame.surfarray.array3d(window.screen)
+
+        self.assertTrue(np.array_equal(incremental, full))
+        pygame.quit()
+
+    def test_keyboard_events(self):
+        pygame.init()
+        game = Game(10, 10, [
+            PositionPlayer(1, KeyboardPlayer(Direction.RIGHT, Mode.ZQSD), [0, 0]),
+            PositionPlayer(2, KeyboardPlayer(Direction.LEFT, Mode.ARROWS), [9, 9]),
+        ])
+        window = Window(game, 7)
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_s))
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_UP))
+        game.next_frame(window)
+
+        self.assertEqual(game.pps[0].player.direction, Direction.DOWN)
+        self.assertEqual(game.pps[1].player.direction, Direction.UP)
+        self.assertEqual(game.pps[0].player.left(), pygame.K_q)
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
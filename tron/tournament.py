@@ -0,0 +1,173 @@
+"""
+This module contains the Tournament class, that compares players by making
+them play against each other.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import random
+
+import numpy as np
+
+from tron.game import Game, PositionPlayer
+
+
+def play_games(factory_one, factory_two, width, height, seeds):
+    """
+    Plays two games per seed between the players created by two factories,
+    from the same random start positions with the sides swapped.
+
+    Returns the number of games won by the first player, by the second one,
+    and the number of draws.
+    """
+    results = [0, 0, 0]
+    for seed in seeds:
+        generator = random.Random(seed)
+        while True:
+            positions = [[generator.randint(0, width - 1), generator.randint(0, height - 1)] for _ in range(2)]
+            if positions[0] != positions[1]:
+                break
+
+        for swap in (False, True):
+            factories = (factory_two, factory_one) if swap else (factory_one, factory_two)
+            game = Game(width, height, [
+                PositionPlayer(1, factories[0](), list(positions[0])),
+                PositionPlayer(2, factories[1](), list(positions[1])),
+            ])
+            game.main_loop()
+
+            if game.winner is None:
+                results[2] += 1
+            elif (game.winner == 1) != swap:
+                results[0] += 1
+            else:
+                results[1] += 1
+    return results
+
+
+class Tournament:
+    """
+    This class runs a round-robin tournament between players.
+
+    Every pair of players plays a number of games from random start positions,
+    each position being played twice with the sides swapped. The games are
+    split in chunks that are played by a pool of processes, and the results are
+    aggregated as they arrive.
+
+    The players are given as factories, callables returning a new Player for
+    each game, that must be picklable to be sent to the processes: classes,
+    functions defined at the top level of a module or functools.partial of them.
+    """
+    def __init__(self, factories, width, height, games_per_pairing, workers = None, chunk_size = 50, seed = 0):
+        """
+        Creates a tournament between the players of a dictionary of factories
+        by name.
+
+        games_per_pairing must be even, since each start position is played
+        twice. workers is the number of processes, all the processors by
+        default, or 0 to play the games in the current process.
+        """
+        if games_per_pairing % 2 != 0:
+            raise ValueError('games_per_pairing must be even, got {}'.format(games_per_pairing))
+        self.names = list(factories)
+        self.factories = [factories[name] for name in self.names]
+        self.width = width
+        self.height = height
+        self.games_per_pairing = games_per_pairing
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.seed = seed
+
+        count = len(self.names)
+        self.wins = np.zeros((count, count), dtype=np.int64)
+        self.draws = np.zeros((count, count), dtype=np.int64)
+
+    def chunks(self):
+        """
+        Returns the games to play, as tuples (i, j, seeds) where i and j are
+        the indices of the players.
+        """
+        chunks = []
+        seed = self.seed
+        positions = self.games_per_pairing // 2
+        for i in range(len(self.names)):
+            for j in range(i + 1, len(self.names)):
+                for start in range(0, positions, self.chunk_size):
+                    count = min(self.chunk_size, positions - start)
+                    chunks.append((i, j, range(seed, seed + count)))
+                    seed += count
+        return chunks
+
+    def record(self, i, j, results):
+        """
+        Adds the results of games between players i and j.
+        """
+        (wins_i, wins_j, draws) = results
+        self.wins[i, j] += wins_i
+        self.wins[j, i] += wins_j
+        self.draws[i, j] += draws
+        self.draws[j, i] += draws
+
+    def run(self):
+        """
+        Plays the tournament, yielding the tournament itself each time new
+        results are recorded, so that partial results can be shown.
+        """
+        chunks = self.chunks()
+
+        if self.workers == 0:
+            for (i, j, seeds) in chunks:
+                results = play_games(self.factories[i], self.factories[j], self.width, self.height, seeds)
+                self.record(i, j, results)
+                yield self
+            return
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            futures = {
+                executor.submit(
+                    play_games, self.factories[i], self.factories[j], self.width, self.height, seeds): (i, j)
+                for (i, j, seeds) in chunks
+            }
+            for future in as_completed(futures):
+                (i, j) = futures[future]
+                self.record(i, j, future.result())
+                yield self
+
+    def games(self):
+        """
+        Returns the matrix of the number of games played between each pair of players.
+        """
+        return self.wins + self.wins.T + self.draws
+
+    def ratings(self, iterations = 100):
+        """
+        Returns the Elo-style ratings of the players, with an average of 1500.
+
+        The ratings are the ones of a Bradley-Terry model fitted to the results,
+        a draw counting as half a win for each player. Each player is given
+        a virtual draw against each other player so that the ratings stay
+        finite.
+        """
+        count = len(self.names)
+        games = self.games() + (1 - np.eye(count))
+        scores = (self.wins + 0.5 * self.draws + 0.5 * (1 - np.eye(count))).sum(axis=1)
+
+        strengths = np.ones(count)
+        for _ in range(iterations):
+            strengths = scores / (games / (strengths[:, None] + strengths[None, :])).sum(axis=1)
+            strengths /= np.exp(np.log(strengths).mean())
+
+        return 1500 + 400 * np.log10(strengths)
+
+    def standings(self):
+        """
+        Returns a table of the players sorted by rating, as a string.
+        """
+        ratings = self.ratings()
+        games = self.games().sum(axis=1)
+        wins = self.wins.sum(axis=1)
+        draws = self.draws.sum(axis=1)
+        lines = ['{:<20} {:>7} {:>7} {:>7} {:>7} {:>7}'.format('player', 'rating', 'games', 'wins', 'draws', 'losses')]
+        for k in np.argsort(-ratings):
+            lines.append('{:<20} {:>7.0f} {:>7} {:>7} {:>7} {:>7}'.format(
+                self.names[k], ratings[k], games[k], wins[k], draws[k], games[k] - wins[k] - draws[k]))
+        return '\n'.join(lines)
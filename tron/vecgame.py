@@ -0,0 +1,155 @@
+"""
+This module contains the VecGame class, that runs many games at once.
+"""
+
+import numpy as np
+
+from tron.map import TileMap, Tile
+
+# Moves of a head indexed by the value of a Direction: UP, RIGHT, DOWN, LEFT.
+MOVES = np.array([[0, 0], [-1, 0], [0, 1], [1, 0], [0, -1]])
+
+class VecGame:
+    """
+    This class contains n two-player games of the same size, stepped together.
+
+    The maps of all the games are stored in a single (n, width + 2, height + 2)
+    array of tile codes, with the same layout as TileMap, and every step
+    resolves the moves of all the games with array operations. Games that are
+    finished are automatically reset to new random start positions, unless
+    auto_reset is False, in which case they are left as they are until they
+    are reset explicitly.
+    """
+
+    players = 2
+
+    def __init__(self, n, width, height, seed = None, auto_reset = True):
+        """
+        Creates n games from their width and height.
+
+        The seed is used for the random start positions of the games.
+        """
+        self.n = n
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.auto_reset = auto_reset
+
+        self._template = TileMap(width, height)
+        self._heads = np.array([Tile.PLAYER_ONE_HEAD.value, Tile.PLAYER_TWO_HEAD.value], dtype=np.int8)
+        self._bodies = np.array([Tile.PLAYER_ONE_BODY.value, Tile.PLAYER_TWO_BODY.value], dtype=np.int8)
+        self._rows = np.arange(n)[:, None]
+
+        self.board = np.empty((n, width + 2, height + 2), dtype=np.int8)
+        self.positions = np.zeros((n, self.players, 2), dtype=np.int64)
+        self.frames = np.zeros(n, dtype=np.int64)
+        self.durations = np.zeros(n, dtype=np.int64)
+        self.finished = np.zeros(n, dtype=np.bool_)
+
+        self.reset()
+
+    def random_positions(self, count):
+        """
+        Returns count random sets of distinct start positions.
+        """
+        cells = self.rng.integers(0, self.width * self.height, size=(count, self.players))
+        while True:
+            collide = np.any(np.diff(np.sort(cells, axis=1), axis=1) == 0, axis=1)
+            if not collide.any():
+                break
+            cells[collide] = self.rng.integers(0, self.width * self.height, size=(collide.sum(), self.players))
+        return np.stack([cells // self.height, cells % self.height], axis=-1)
+
+    def reset(self, indices = None, positions = None):
+        """
+        Resets some games, or all the games if indices is None.
+
+        If positions is None, the players of the games start at random
+        positions, otherwise positions must be an array of shape
+        (len(indices), 2, 2).
+        """
+        if indices is None:
+            indices = np.arange(self.n)
+        indices = np.asarray(indices)
+        if positions is None:
+            positions = self.random_positions(len(indices))
+
+        self.board[indices] = self._template.array()
+        self.positions[indices] = positions
+        self.frames[indices] = 0
+        self.finished[indices] = False
+        self.board[indices[:, None], positions[..., 0] + 1, positions[..., 1] + 1] = self._heads
+
+    def step(self, actions):
+        """
+        Computes the next frame of every game.
+
+        actions is an array of shape (n, 2) containing the values of the
+        Direction chosen by each player. A player dies if it lands on a square
+        that is not empty, or on the same square as the other player.
+
+        Returns two arrays of shape (n,): whether each game finished during
+        this step, and its winner (1 or 2, or 0 for a draw or a game that is
+        not finished). The durations of the finished games are stored in the
+        durations array. If auto_reset is True, they are reset before this
+        function returns, otherwise they are marked in the finished array and
+        the actions of their players are ignored until they are reset.
+        """
+        if self.auto_reset or not self.finished.any():
+            return self._step(self._rows, self.positions, actions)
+
+        # Only step the games that are not finished
+        active = np.flatnonzero(~self.finished)
+        positions = self.positions[active]
+        (done, winner) = self._step(active[:, None], positions, np.asarray(actions)[active])
+        self.positions[active] = positions
+
+        all_done = np.zeros(self.n, dtype=np.bool_)
+        all_winner = np.zeros(self.n, dtype=winner.dtype)
+        all_done[active] = done
+        all_winner[active] = winner
+        return (all_done, all_winner)
+
+    def _step(self, rows, positions, actions):
+        """
+        Steps the games of rows, whose positions are updated in place.
+        """
+        # Set previous heads to body
+        self.board[rows, positions[..., 0] + 1, positions[..., 1] + 1] = self._bodies
+
+        # Play next move
+        positions += MOVES[actions]
+        x = positions[..., 0] + 1
+        y = positions[..., 1] + 1
+
+        # Check boundaries and collisions, walls being on the borders of the board
+        dead = self.board[rows, x, y] != Tile.EMPTY.value
+
+        # Both players reaching the same tile at the same moment is a draw
+        head_on = np.all(positions[:, 0] == positions[:, 1], axis=1)
+        dead[head_on] = True
+
+        self.board[rows, x, y] = self._heads
+        games = rows[:, 0]
+        self.frames[games] += 1
+
+        done = dead.any(axis=1)
+        winner = np.where(done & ~dead[:, 0], 1, 0) + np.where(done & ~dead[:, 1], 2, 0)
+
+        if done.any():
+            finished = games[done]
+            self.durations[finished] = self.frames[finished]
+            if self.auto_reset:
+                self.reset(finished)
+            else:
+                self.finished[finished] = True
+
+        return (done, winner)
+
+    def states_for_player(self, p):
+        """
+        Returns the perception of player p in every game, as an array of shape
+        (n, height + 2, width + 2), each image being the one that
+        TileMap.state_for_player would return.
+        """
+        return self._template.perception_table(p)[self.board.transpose(0, 2, 1)]
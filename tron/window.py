@@ -1,9 +1,15 @@
 """
 This module contains the classes that helps us watch a game of tron.
+
+It is the only module of tron that uses pygame, so that the games can run
+without loading it when nothing is displayed.
 """
 
+import numpy as np
 import pygame
 
+from tron.map import TileMap, Tile
+
 class Window:
     """
     This class represents a window, with the functions to help us render a game.
@@ -19,8 +25,21 @@ class Window:
         (width, height) = (factor * (game.width + 2), factor * (game.height + 2))
 
         self.screen = pygame.display.set_mode((width, height))
+        self._drawn = None
         self.render_map(game.map())
 
+    def events(self):
+        """
+        Returns the events that occurred on the window since the last call.
+        """
+        return pygame.event.get()
+
+    def reset(self):
+        """
+        Forces the next rendering to redraw the whole map.
+        """
+        self._drawn = None
+
     def scale_box(self, row, col, width, height):
         """
         Rescale a box depending on the factor of the window.
@@ -30,6 +49,31 @@ class Window:
     def render_map(self, game_map):
         """
         Renders a map on the screen.
+
+        If the map is a TileMap of the same size as the last one rendered, only
+        the tiles that changed are redrawn and updated on the screen.
+        Otherwise, the whole map is redrawn.
+        """
+        if not isinstance(game_map, TileMap) or self._drawn is None or \
+           self._drawn.shape != game_map.array().shape or \
+           self._screen_size != self.screen.get_size():
+            self.render_full_map(game_map)
+            return
+
+        codes = game_map.array()
+        (rows, cols) = np.nonzero(codes[1:-1, 1:-1] != self._drawn[1:-1, 1:-1])
+        rects = []
+        for (row, col) in zip(rows, cols):
+            if row < game_map.height and col < game_map.width:
+                rects.append(self.render_tile(row, col, Tile(codes[row + 1, col + 1])))
+
+        self._drawn = codes.copy()
+        if rects:
+            pygame.display.update(rects)
+
+    def render_full_map(self, game_map):
+        """
+        Redraws the whole map on the screen.
         """
         self.screen.fill((0, 0, 0))
 
@@ -48,3 +92,18 @@ class Window:
                         self.scale_box(col+1.1, row+1.1, 0.9, 0.9))
 
         pygame.display.flip()
+
+        self._drawn = game_map.array().copy() if isinstance(game_map, TileMap) else None
+        self._screen_size = self.screen.get_size()
+
+    def render_tile(self, row, col, block):
+        """
+        Redraws a single tile, and returns the rectangle of the screen that changed.
+        """
+        box = self.scale_box(col + 1, row + 1, 1, 1)
+        pygame.draw.rect(self.screen, (255, 255, 255), box)
+        pygame.draw.rect(
+            self.screen,
+            block.color(),
+            self.scale_box(col+1.1, row+1.1, 0.9, 0.9))
+        return pygame.Rect(box)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+import sys
+from time import sleep
+
+# Import pygame without printing anything on the terminal
+import pygame
+
+from tron.replay import ReplayReader
+from tron.window import Window
+
+# This script shows how to watch a game stored in a replay file, written with
+# tron.replay.ReplayWriter.
+#
+#     ./watch.py games.replay 42
+#
+# plays the game number 42 of the file games.replay.
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: {} REPLAY_FILE [GAME_NUMBER]'.format(sys.argv[0]))
+        return
+
+    replays = ReplayReader(sys.argv[1])
+    number = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    replay = replays[number]
+
+    # Initialize the game engine
+    pygame.init()
+
+    # A replay can be displayed by a window like a game
+    window = Window(replay, 10)
+
+    # Render the map of each step, with the framerate of play.py
+    for game_map in replay.maps():
+        sleep(0.1)
+        window.render_map(game_map)
+
+    if replay.winner is None:
+        print("It's a draw!")
+    else:
+        print('Player {} wins!'.format(replay.winner))
+
+if __name__ == '__main__':
+    main()